@@ -0,0 +1,192 @@
+"""Бенчмарк режимов парсера на записанных страницах.
+
+Запись корпуса страниц (нужен доступ в сеть):
+    python benchmarks/bench.py record
+
+Прогон режимов на записанном корпусе без сети и сравнение с базовыми
+результатами:
+    python benchmarks/bench.py run --baseline benchmarks/baseline.json
+"""
+import argparse
+import gzip
+import importlib
+import json
+import re
+import sys
+import time
+import tracemalloc
+from argparse import Namespace
+from collections import deque
+from hashlib import sha256
+from pathlib import Path
+
+import requests_cache
+import requests_mock
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BENCH_DIR.parent / 'src'))
+extractors = importlib.import_module('extractors')
+main = importlib.import_module('main')
+
+CORPUS_DIR = BENCH_DIR / 'corpus'
+INDEX_FILE = 'index.json'
+MODES = ('pep', 'whats-new', 'latest-versions')
+# Допустимое ухудшение показателей относительно базовых результатов.
+TOLERANCE = 0.2
+# Какой функцией разбирается страница с подходящим URL.
+URL_TO_EXTRACTOR = (
+    (re.compile(r'peps\.python\.org/$'), extractors.extract_pep_index),
+    (re.compile(r'peps\.python\.org/pep-\d+/$'),
+     extractors.extract_pep_card),
+    (re.compile(r'/whatsnew/$'), extractors.extract_whats_new_links),
+    (re.compile(r'/whatsnew/\d+\.\d+\.html$'), extractors.extract_whats_new),
+    (re.compile(r'docs\.python\.org/3/$'), extractors.extract_version_links),
+)
+
+
+def mode_args(workers):
+    return Namespace(workers=workers, parse_workers=None, incremental=False)
+
+
+def record(corpus_dir, workers):
+    """Выполняет режимы парсера по сети и сохраняет все ответы в корпус."""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    index = {}
+
+    def save(response, *args, **kwargs):
+        file_name = sha256(response.url.encode()).hexdigest() + '.html.gz'
+        (corpus_dir / file_name).write_bytes(gzip.compress(response.content))
+        index[response.url] = file_name
+
+    session = requests_cache.CachedSession(backend='memory')
+    session.hooks['response'].append(save)
+    for mode in MODES:
+        deque(main.MODE_TO_FUNCTION[mode](session, mode_args(workers)), 0)
+    with open(corpus_dir / INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    print(f'Записано страниц: {len(index)}')
+
+
+def load_corpus(corpus_dir):
+    with open(corpus_dir / INDEX_FILE, encoding='utf-8') as f:
+        index = json.load(f)
+    return {
+        url: gzip.decompress((corpus_dir / file_name).read_bytes())
+        for url, file_name in index.items()
+    }
+
+
+def replay_session(corpus):
+    """Сессия, которая отдаёт страницы из корпуса вместо сети."""
+    adapter = requests_mock.Adapter()
+    for url, content in corpus.items():
+        adapter.register_uri('GET', url, content=content)
+    session = requests_cache.CachedSession(backend='memory')
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session, adapter
+
+
+def bench_mode(mode, corpus, workers):
+    session, adapter = replay_session(corpus)
+    tracemalloc.start()
+    started = time.perf_counter()
+    deque(main.MODE_TO_FUNCTION[mode](session, mode_args(workers)), 0)
+    wall_time = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pages = adapter.call_count
+    return {
+        'wall_time': wall_time,
+        'pages': pages,
+        'pages_per_sec': pages / wall_time,
+        'peak_mb': peak / 2 ** 20,
+    }
+
+
+def bench_parse(corpus):
+    """Среднее время разбора одной страницы каждой функцией, мс."""
+    timings = {}
+    for url, content in corpus.items():
+        for pattern, extractor in URL_TO_EXTRACTOR:
+            if pattern.search(url):
+                html = content.decode('utf-8')
+                started = time.perf_counter()
+                extractor(html)
+                timings.setdefault(extractor.__name__, []).append(
+                    time.perf_counter() - started
+                )
+                break
+    return {
+        name: 1000 * sum(times) / len(times)
+        for name, times in timings.items()
+    }
+
+
+def compare(report, baseline):
+    """Возвращает сообщения о показателях хуже базовых более чем
+    на TOLERANCE.
+    """
+    regressions = []
+    for mode, metrics in report['modes'].items():
+        base = baseline['modes'].get(mode)
+        if base is None:
+            continue
+        for key in ('wall_time', 'peak_mb'):
+            if metrics[key] > base[key] * (1 + TOLERANCE):
+                regressions.append(
+                    f'{mode}: {key} {metrics[key]:.3f} > {base[key]:.3f}'
+                )
+    for name, parse_ms in report['parse_ms_per_page'].items():
+        base_ms = baseline['parse_ms_per_page'].get(name)
+        if base_ms is not None and parse_ms > base_ms * (1 + TOLERANCE):
+            regressions.append(
+                f'{name}: parse_ms_per_page {parse_ms:.3f} > {base_ms:.3f}'
+            )
+    return regressions
+
+
+def run(corpus_dir, workers, baseline_path, save_baseline):
+    corpus = load_corpus(corpus_dir)
+    report = {
+        'modes': {mode: bench_mode(mode, corpus, workers) for mode in MODES},
+        'parse_ms_per_page': bench_parse(corpus),
+    }
+    print(json.dumps(report, indent=2))
+    if baseline_path is None:
+        return 0
+    if save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return 0
+    with open(baseline_path, encoding='utf-8') as f:
+        regressions = compare(report, json.load(f))
+    for msg in regressions:
+        print(f'Регрессия: {msg}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(description='Бенчмарк режимов парсера')
+    parser.add_argument('command', choices=('record', 'run'))
+    parser.add_argument('--corpus', type=Path, default=CORPUS_DIR)
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument(
+        '--baseline', type=Path,
+        help='Файл с базовыми результатами для сравнения'
+    )
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Сохранить результаты прогона как базовые'
+    )
+    return parser
+
+
+if __name__ == '__main__':
+    args = configure_argument_parser().parse_args()
+    if args.command == 'record':
+        record(args.corpus, args.workers)
+    else:
+        sys.exit(
+            run(args.corpus, args.workers, args.baseline, args.save_baseline)
+        )
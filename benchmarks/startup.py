@@ -0,0 +1,94 @@
+"""Бенчмарк времени запуска CLI парсера.
+
+Запускает `python -X importtime src/main.py <аргументы>` несколько раз
+и выводит медианное время запуска, время импорта модулей и самые
+медленные импорты. Аргументы по умолчанию — `-h`:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --max-ms 100 -- pep-query --status Active
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+MAIN_FILE = BENCH_DIR.parent / 'src' / 'main.py'
+# Пакеты, которые не должны загружаться при запуске без обращения к сети.
+HEAVY_MODULES = (
+    'requests', 'requests_cache', 'bs4', 'lxml', 'tqdm', 'prettytable',
+    'pyarrow',
+)
+
+
+def parse_importtime(stderr):
+    """Возвращает {модуль: собственное время импорта, мкс} из вывода
+    `-X importtime`.
+    """
+    self_times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        self_times[name.strip()] = int(self_us)
+    return self_times
+
+
+def run_once(cli_args):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(MAIN_FILE), *cli_args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        cwd=MAIN_FILE.parent
+    )
+    return time.perf_counter() - started, parse_importtime(completed.stderr)
+
+
+def bench(cli_args, repeat, top):
+    runs = [run_once(cli_args) for _ in range(repeat)]
+    wall_times = [wall_time for wall_time, _ in runs]
+    self_times = runs[-1][1]
+    slowest = sorted(self_times.items(), key=lambda item: -item[1])[:top]
+    return {
+        'args': cli_args,
+        'wall_ms': 1000 * statistics.median(wall_times),
+        'import_ms': sum(self_times.values()) / 1000,
+        'heavy_modules': [
+            name for name in HEAVY_MODULES if name in self_times
+        ],
+        'slowest_imports_ms': {
+            name: self_us / 1000 for name, self_us in slowest
+        },
+    }
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк времени запуска парсера'
+    )
+    parser.add_argument(
+        'cli_args', nargs='*', default=['-h'],
+        help='Аргументы main.py (после --)'
+    )
+    parser.add_argument('-n', '--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument(
+        '--max-ms', type=float,
+        help='Завершиться с кодом 1, если медианное время запуска больше'
+    )
+    return parser
+
+
+if __name__ == '__main__':
+    args = configure_argument_parser().parse_args()
+    report = bench(args.cli_args, args.repeat, args.top)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.max_ms is not None and report['wall_ms'] > args.max_ms:
+        print(
+            f'Регрессия: запуск {report["wall_ms"]:.1f} мс > '
+            f'{args.max_ms:.1f} мс',
+            file=sys.stderr
+        )
+        sys.exit(1)
@@ -0,0 +1,107 @@
+from array import array
+from collections import Counter
+
+from constants import EXPECTED_STATUS
+
+
+class CategoricalColumn:
+    """Колонка с повторяющимися строками: значения хранятся один раз,
+    а по строкам таблицы — только их коды в массиве.
+    Коды выдаются в порядке первого появления значения.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.value_codes = {}
+        self.codes = array('H')
+
+    def append(self, value):
+        code = self.value_codes.get(value)
+        if code is None:
+            code = self.value_codes[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class PepTable:
+    """Колоночная таблица PEP, собранная при обходе страниц.
+
+    Подсчёт статусов, поиск несовпадений и перекрёстная таблица
+    ожидаемых и фактических статусов считаются одним проходом
+    по кодам колонок, а не построчно во время загрузки.
+    """
+
+    def __init__(self):
+        self.numbers = array('I')
+        self.categories = CategoricalColumn()
+        self.urls = []
+        self.statuses = CategoricalColumn()
+        self.types = CategoricalColumn()
+        self.authors = []
+        self.created = []
+
+    def append(self, number, category, url, status, pep_type, authors,
+               created):
+        self.numbers.append(number)
+        self.categories.append(category)
+        self.urls.append(url)
+        self.statuses.append(status)
+        self.types.append(pep_type)
+        self.authors.append(authors)
+        self.created.append(created)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def rows(self):
+        for i in range(len(self)):
+            yield (
+                self.numbers[i], self.categories[i], self.urls[i],
+                self.statuses[i], self.types[i], self.authors[i],
+                self.created[i]
+            )
+
+    def status_counts(self):
+        """Количество PEP в каждом статусе в порядке первого появления."""
+        counts = Counter(self.statuses.codes)
+        return [
+            (status, counts[code])
+            for code, status in enumerate(self.statuses.values)
+        ]
+
+    def crosstab(self):
+        """Количество PEP по парам (категория, статус в карточке)."""
+        pairs = Counter(zip(self.categories.codes, self.statuses.codes))
+        return {
+            (self.categories.values[category], self.statuses.values[status]):
+                count
+            for (category, status), count in pairs.items()
+        }
+
+    def mismatches(self):
+        """Возвращает (url, статус, ожидаемые статусы) для PEP, у которых
+        статус в карточке не совпадает с категорией в общей таблице.
+        Проверяется только каждая уникальная пара категории и статуса.
+        """
+        mismatched = {
+            (category_code, status_code)
+            for category_code, category in enumerate(self.categories.values)
+            for status_code, status in enumerate(self.statuses.values)
+            if status not in EXPECTED_STATUS[category[1:]]
+        }
+        return [
+            (
+                self.urls[i], self.statuses.values[status_code],
+                EXPECTED_STATUS[self.categories.values[category_code][1:]]
+            )
+            for i, (category_code, status_code) in enumerate(
+                zip(self.categories.codes, self.statuses.codes)
+            )
+            if (category_code, status_code) in mismatched
+        ]
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import json
+import mmap
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+
+from requests import ConnectionError
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from constants import ARCHIVE_COMPRESSION_LEVEL, ARCHIVE_MAGIC
+
+# Запись индекса: хеш URL, смещение и длина сжатой страницы.
+INDEX_RECORD = struct.Struct('<16sQI')
+# Конец архива: смещение индекса, число записей и сигнатура.
+FOOTER = struct.Struct(f'<QI{len(ARCHIVE_MAGIC)}s')
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+def url_key(url):
+    return hashlib.blake2b(url.encode(), digest_size=16).digest()
+
+
+class ArchiveWriter:
+    """Записывает ответы сервера в архив страниц.
+
+    Архив — один файл: сжатые zlib страницы подряд, за ними
+    отсортированный по хешу URL индекс записей фиксированной длины.
+    Индекс пишется при закрытии архива.
+    """
+
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, 'wb')
+        self.file.write(ARCHIVE_MAGIC)
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def add(self, url, status, headers, content):
+        meta = json.dumps({
+            'url': url,
+            'status': status,
+            'headers': {
+                name: value for name, value in headers.items()
+                if name.lower() not in SKIPPED_HEADERS
+            },
+        }).encode()
+        payload = zlib.compress(
+            meta + b'\n' + content, ARCHIVE_COMPRESSION_LEVEL
+        )
+        with self.lock:
+            offset = self.file.tell()
+            self.file.write(payload)
+            self.entries[url_key(url)] = (offset, len(payload))
+
+    def record(self, response, *args, **kwargs):
+        """Хук сессии requests: сохраняет ответ в архив.
+        Потоковые ответы (загрузка архивов документации) не сохраняются,
+        чтобы не читать их тело в память.
+        """
+        if kwargs.get('stream'):
+            return
+        self.add(
+            response.request.url, response.status_code, response.headers,
+            response.content
+        )
+
+    def close(self):
+        with self.lock:
+            index_offset = self.file.tell()
+            for key in sorted(self.entries):
+                self.file.write(INDEX_RECORD.pack(key, *self.entries[key]))
+            self.file.write(
+                FOOTER.pack(index_offset, len(self.entries), ARCHIVE_MAGIC)
+            )
+            self.file.close()
+
+
+class ArchiveReader:
+    """Читает страницы из архива, отображённого в память.
+    Страница ищется двоичным поиском по индексу, в память
+    распаковывается только найденная запись.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index_offset, self.count, magic = FOOTER.unpack_from(
+            self.map, len(self.map) - FOOTER.size
+        )
+        if magic != ARCHIVE_MAGIC or self.map[:len(magic)] != magic:
+            self.map.close()
+            raise ValueError(f'Файл {path} не является архивом страниц')
+
+    def find(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record = INDEX_RECORD.unpack_from(
+                self.map, self.index_offset + middle * INDEX_RECORD.size
+            )
+            if record[0] == key:
+                return record[1:]
+            if record[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, url):
+        """Возвращает (статус, заголовки, тело) страницы или None."""
+        location = self.find(url_key(url))
+        if location is None:
+            return None
+        offset, length = location
+        meta, content = zlib.decompress(
+            self.map[offset:offset + length]
+        ).split(b'\n', 1)
+        meta = json.loads(meta)
+        if meta['url'] != url:
+            return None
+        return meta['status'], meta['headers'], content
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+
+class ArchiveAdapter(HTTPAdapter):
+    """HTTP-адаптер, который отвечает страницами из архива
+    вместо запросов в сеть.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = ArchiveReader(path)
+
+    def send(self, request, **kwargs):
+        page = self.archive.get(request.url)
+        if page is None:
+            raise ConnectionError(
+                f'Страница {request.url} отсутствует в архиве',
+                request=request
+            )
+        status, headers, content = page
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def close(self):
+        super().close()
+        self.archive.close()
+
+
+@contextmanager
+def record_archive(session, path):
+    """Записывает в архив path все ответы, полученные сессией
+    внутри блока. Без path ничего не делает.
+    """
+    if path is None:
+        yield
+        return
+    writer = ArchiveWriter(path)
+    session.hooks['response'].append(writer.record)
+    try:
+        yield
+    finally:
+        session.hooks['response'].remove(writer.record)
+        writer.close()
@@ -1,15 +1,41 @@
 import argparse
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
-from constants import (DT_FORMAT, LOG_DIR, LOG_FILE, LOG_FORMAT, OUTPUT_FILE,
-                       OUTPUT_PRETTY_TABLE)
+from constants import (CACHE_BACKENDS, CACHE_MEMORY, CACHE_NAME,
+                       CACHE_PAGESTORE, CACHE_SQLITE, DEFAULT_WORKERS,
+                       DT_FORMAT, HOSTS_IN_POOL, LOG_DIR, LOG_FILE, LOG_FORMAT,
+                       MAX_CACHE_SIZE_MB, METRICS_FORMAT_TO_EXTENSION,
+                       OUTPUT_FEATHER, OUTPUT_FILE, OUTPUT_JSONL,
+                       OUTPUT_PARQUET, OUTPUT_PRETTY_TABLE, QUEUE_IDLE_TIMEOUT,
+                       QUEUE_SHARD_SIZE, SERVICE_HOST, SERVICE_PORT,
+                       URLS_EXPIRE_AFTER)
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается целое число больше нуля, получено {value}'
+        )
+    return number
+
+
+def positive_float(value):
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается число больше нуля, получено {value}'
+        )
+    return number
 
 
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -23,9 +49,155 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(OUTPUT_PRETTY_TABLE, OUTPUT_FILE,),
+        choices=(
+            OUTPUT_PRETTY_TABLE, OUTPUT_FILE, OUTPUT_JSONL, OUTPUT_FEATHER,
+            OUTPUT_PARQUET,
+        ),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help='Количество потоков для параллельной загрузки страниц'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=positive_int,
+        help=(
+            'Количество процессов для разбора HTML '
+            '(по умолчанию страницы разбираются в потоках загрузки)'
+        )
+    )
+    parser.add_argument(
+        '--max-connections',
+        type=positive_int,
+        help=(
+            'Максимум keep-alive соединений с одним хостом '
+            '(по умолчанию равен числу потоков)'
+        )
+    )
+    parser.add_argument(
+        '--max-rss',
+        type=positive_int,
+        help=(
+            'Бюджет памяти процесса в мегабайтах: новые страницы не '
+            'загружаются, пока он превышен'
+        )
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='Записать в лог пик памяти режимов (tracemalloc)'
+    )
+    parser.add_argument(
+        '--rate',
+        type=positive_float,
+        help='Максимум запросов в секунду к одному хосту'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=CACHE_BACKENDS,
+        default=CACHE_SQLITE,
+        help='Хранилище кеша HTTP-ответов'
+    )
+    parser.add_argument(
+        '--cache-name',
+        default=CACHE_NAME,
+        help='Путь к кешу: файл базы sqlite или директория filesystem'
+    )
+    parser.add_argument(
+        '--max-cache-size',
+        type=positive_int,
+        default=MAX_CACHE_SIZE_MB,
+        help=(
+            'Максимальный размер кеша pagestore в мегабайтах, '
+            'для команды cache-prune'
+        )
+    )
+    parser.add_argument(
+        '--expire-after',
+        type=int,
+        help=(
+            'Срок жизни кеша в секундах для URL, не попавших '
+            'в шаблоны URLS_EXPIRE_AFTER'
+        )
+    )
+    parser.add_argument(
+        '--revalidate',
+        action='store_true',
+        help='Проверять каждую страницу кеша условным запросом'
+    )
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        '--record',
+        type=Path,
+        metavar='PATH',
+        help='Записать загруженные страницы в архив для запуска без сети'
+    )
+    archive_group.add_argument(
+        '--from-archive',
+        type=Path,
+        metavar='PATH',
+        help='Брать страницы из архива, записанного с флагом --record'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Разбирать только страницы, изменившиеся с прошлого запуска'
+    )
+    parser.add_argument(
+        '--queue',
+        type=Path,
+        metavar='PATH',
+        help=(
+            'Файл очереди SQLite: страницы режимов pep и whats-new '
+            'делятся на шарды для команды worker'
+        )
+    )
+    parser.add_argument(
+        '--shard-size',
+        type=positive_int,
+        default=QUEUE_SHARD_SIZE,
+        help='Количество страниц в одном шарде очереди'
+    )
+    parser.add_argument(
+        '--idle-timeout',
+        type=float,
+        default=QUEUE_IDLE_TIMEOUT,
+        help='Сколько секунд команда worker ждёт новые шарды'
+    )
+    parser.add_argument(
+        '--status',
+        help='Фильтр pep-query: статус PEP'
+    )
+    parser.add_argument(
+        '--type',
+        help='Фильтр pep-query: тип PEP'
+    )
+    parser.add_argument(
+        '--author',
+        help='Фильтр pep-query: часть имени автора'
+    )
+    parser.add_argument(
+        '--host',
+        default=SERVICE_HOST,
+        help='Адрес HTTP API команды serve'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=SERVICE_PORT,
+        help='Порт HTTP API команды serve'
+    )
+    parser.add_argument(
+        '-m',
+        '--metrics',
+        choices=METRICS_FORMAT_TO_EXTENSION.keys(),
+        help='Сохранить метрики работы парсера в файл'
+    )
 
     return parser
 
@@ -41,3 +213,52 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler())
     )
+
+
+def configure_session(cli_args):
+    """Создаёт кеширующую сессию с общим пулом keep-alive соединений.
+    Потоки переиспользуют соединения с хостом, а не открывают новое
+    TLS-соединение на каждую страницу. Устаревшие страницы кеша
+    перезапрашиваются условным GET, неизменённые страницы не загружаются.
+    Запросы в сеть ограничиваются по частоте (--rate) и числу
+    одновременных соединений и повторяются после ответов 429/5xx.
+    С флагом --from-archive страницы берутся из архива, а не из сети.
+    """
+    import requests_cache
+
+    from archive import ArchiveAdapter
+    from throttling import ThrottledAdapter
+
+    if cli_args.from_archive:
+        session = requests_cache.CachedSession(backend=CACHE_MEMORY)
+        adapter = ArchiveAdapter(cli_args.from_archive)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    cache = {
+        'cache_name': str(cli_args.cache_name),
+        'backend': cli_args.cache_backend,
+    }
+    if cli_args.cache_backend == CACHE_PAGESTORE:
+        from page_store import PageStoreCache
+
+        cache = {'backend': PageStoreCache(
+            cli_args.cache_name, max_size=cli_args.max_cache_size * 2 ** 20
+        )}
+    session = requests_cache.CachedSession(
+        **cache,
+        expire_after=cli_args.expire_after,
+        urls_expire_after=URLS_EXPIRE_AFTER,
+        always_revalidate=cli_args.revalidate
+    )
+    max_connections = cli_args.max_connections or cli_args.workers
+    adapter = ThrottledAdapter(
+        rate=cli_args.rate,
+        max_concurrency=max_connections,
+        pool_connections=HOSTS_IN_POOL,
+        pool_maxsize=max_connections,
+        pool_block=True
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 
 # Константы директорий.
@@ -5,7 +6,98 @@ BASE_DIR = Path(__file__).parent
 DOWNLOADS = 'downloads'
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
+CACHE_NAME = BASE_DIR / 'http_cache'
 RESULTS = 'results'
+METRICS_DIR = 'metrics'
+STATE_DIR = BASE_DIR / 'state'
+PEP_STATE_FILE = STATE_DIR / 'pep_cards.json'
+PEP_INDEX_FILE = STATE_DIR / 'pep_index.sqlite3'
+
+# Размер части страницы при потоковом разборе, символов.
+PARSE_CHUNK_SIZE = 16 * 1024
+# Размер части файла при потоковой загрузке архива, байт.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Расширение файла, в котором хранится ETag загруженного архива.
+ETAG_SUFFIX = '.etag'
+
+# Архив страниц для запуска без сети (--record / --from-archive).
+ARCHIVE_MAGIC = b'BS4PAGES1'
+ARCHIVE_COMPRESSION_LEVEL = 6
+
+# Ограничение памяти при обходе страниц (--max-rss): размер резидентной
+# памяти читается из STATM_FILE, поток ждёт освобождения памяти
+# не дольше MEMORY_WAIT_TIMEOUT секунд до следующей проверки.
+# После превышения бюджета страницы снова берутся в работу параллельно,
+# когда RSS опустится ниже доли MEMORY_RESUME_RATIO бюджета.
+STATM_FILE = '/proc/self/statm'
+MEMORY_WAIT_TIMEOUT = 0.5
+MEMORY_RESUME_RATIO = 0.9
+
+# Повтор запросов и адаптивное ограничение нагрузки на сайт.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 60
+# Ответ дольше TARGET_LATENCY секунд считается признаком перегрузки,
+# и число одновременных запросов к хосту умножается на DECREASE_FACTOR.
+TARGET_LATENCY = 2.0
+DECREASE_FACTOR = 0.5
+
+# Режим, который запускает все режимы парсера одной командой.
+MODE_ALL = 'all'
+
+# Хранилища кеша HTTP-ответов.
+CACHE_SQLITE = 'sqlite'
+CACHE_FILESYSTEM = 'filesystem'
+CACHE_MEMORY = 'memory'
+CACHE_PAGESTORE = 'pagestore'
+CACHE_BACKENDS = (
+    CACHE_SQLITE, CACHE_FILESYSTEM, CACHE_MEMORY, CACHE_PAGESTORE
+)
+# Хранилище pagestore: тела страниц без повторов, сжатые zlib со словарём,
+# обученным на первых PAGE_STORE_TRAINING_SAMPLES страницах. Размер
+# ограничен --max-cache-size, давно не читавшиеся ответы удаляются.
+# Время чтения ответов записывается в базу пачками по
+# PAGE_STORE_ACCESS_BATCH ответов.
+PAGE_STORE_SUFFIX = '.pages.sqlite'
+PAGE_STORE_COMPRESSION_LEVEL = 9
+PAGE_STORE_DICTIONARY_SIZE = 32 * 1024
+PAGE_STORE_TRAINING_SAMPLES = 16
+PAGE_STORE_ACCESS_BATCH = 100
+MAX_CACHE_SIZE_MB = 200
+
+# Срок жизни кеша по шаблонам URL, секунд. Срабатывает первый
+# подходящий шаблон. Устаревшая страница перезапрашивается условным
+# GET (ETag / Last-Modified) и при ответе 304 берётся из кеша.
+ONE_HOUR = 60 * 60
+ONE_DAY = 24 * ONE_HOUR
+URLS_EXPIRE_AFTER = {
+    'peps.python.org/pep-*': ONE_DAY,
+    'peps.python.org': ONE_HOUR,
+    'docs.python.org/3/whatsnew/*': ONE_DAY,
+    'docs.python.org/3/': ONE_HOUR,
+}
+
+# Служба (команда serve): адрес HTTP API и период обновления
+# результатов каждого режима, секунд.
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8080
+SERVICE_REFRESH_INTERVALS = {
+    'whats-new': ONE_DAY,
+    'latest-versions': ONE_HOUR,
+    'pep': ONE_HOUR,
+}
+
+# Очередь шардов (флаг --queue и команда worker): число страниц в шарде,
+# срок, после которого шард незавершившегося обработчика отдаётся
+# другому, период опроса очереди в ожидании шардов, время ожидания
+# блокировки базы очереди и время, через которое команда worker
+# без новых шардов завершается, секунд.
+QUEUE_SHARD_SIZE = 50
+QUEUE_LEASE = 10 * 60
+QUEUE_POLL_INTERVAL = 1
+QUEUE_BUSY_TIMEOUT = 60
+QUEUE_IDLE_TIMEOUT = 60
 
 # Константы URL.
 MAIN_DOC_URL = 'https://docs.python.org/3/'
@@ -16,6 +108,19 @@ MAIN_PEPS_URL = 'https://peps.python.org/'
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
 
+# Номер PEP в ссылке на его страницу.
+PEP_NUMBER_PATTERN = re.compile(r'pep-(\d+)')
+# Версия и статус в тексте ссылки на документацию версии Python.
+VERSION_STATUS_PATTERN = re.compile(
+    r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+)
+# Ссылка на архив документации в формате PDF A4.
+PDF_A4_PATTERN = re.compile(r'.+pdf-a4\.zip$')
+# Длина фрагмента страницы в сообщении о ненайденном теге.
+FIND_TAG_EXCERPT_LENGTH = 300
+# Формат даты создания в карточке PEP.
+PEP_CREATED_FORMAT = '%d-%b-%Y'
+
 # Шаблон даты для добавления в имя файла.
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 
@@ -31,6 +136,31 @@ EXPECTED_STATUS = {
     '': ('Draft', 'Active'),
 }
 
+# Количество потоков для параллельной загрузки страниц по умолчанию.
+DEFAULT_WORKERS = 1
+# Количество хостов, для которых сессия держит пулы соединений.
+HOSTS_IN_POOL = 4
+
+# Форматы файла с метриками работы парсера.
+METRICS_JSON = 'json'
+METRICS_PROMETHEUS = 'prometheus'
+METRICS_FORMAT_TO_EXTENSION = {
+    METRICS_JSON: 'json',
+    METRICS_PROMETHEUS: 'prom',
+}
+METRICS_PREFIX = 'bs4_parser'
+
 # Аргументы для вывода информации.
 OUTPUT_PRETTY_TABLE = 'pretty'
 OUTPUT_FILE = 'file'
+OUTPUT_JSONL = 'jsonl'
+OUTPUT_FEATHER = 'feather'
+OUTPUT_PARQUET = 'parquet'
+# Количество строк, которые записываются в файл за один раз.
+OUTPUT_BATCH_SIZE = 1000
+# Типы колонок в форматах feather и parquet (псевдонимы типов pyarrow)
+# по режимам. Колонки, которых здесь нет, записываются строками.
+ARROW_COLUMN_TYPES = {
+    'pep': ('string', 'int64'),
+    'pep-query': ('int64',),
+}
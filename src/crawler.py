@@ -0,0 +1,124 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from constants import DEFAULT_WORKERS
+from memory import MEGABYTE, MemoryBudget
+from metrics import metrics
+from utils import get_response, map_urls
+
+
+def is_ready(result):
+    return not isinstance(result, Future) or result.done()
+
+
+def unwrap(result):
+    return result.result() if isinstance(result, Future) else result
+
+
+def parse_page(url, response, extractor, parse_pool=None, state=None):
+    """Применяет extractor к странице. Возвращает сохранённое значение
+    для неизменившейся страницы, результат разбора или, если задан пул
+    процессов, Future с результатом разбора.
+    """
+    saved = None if state is None else state.get(url, response.content)
+    if saved is not None:
+        return saved
+    if parse_pool is None:
+        with metrics.timer('parse', url):
+            value = extractor(response.text)
+        if state is not None:
+            state.set(url, response.content, value)
+        return value
+    started = time.perf_counter()
+    future = parse_pool.submit(extractor, response.text)
+    content = response.content
+
+    def save(done):
+        metrics.add_time('parse', time.perf_counter() - started, url)
+        if state is not None and done.exception() is None:
+            state.set(url, content, done.result())
+
+    future.add_done_callback(save)
+    return future
+
+
+def extract_page(session, url, extractor):
+    """Загружает одну страницу и применяет к её HTML функцию extractor."""
+    return parse_page(url, get_response(session, url), extractor)
+
+
+def in_order(results):
+    """Отдаёт пары (url, результат) в исходном порядке, не дожидаясь
+    разбора страниц, стоящих в очереди позже.
+    """
+    pending = deque()
+    for url, result in results:
+        pending.append((url, result))
+        while pending and is_ready(pending[0][1]):
+            url, result = pending.popleft()
+            yield url, unwrap(result)
+    while pending:
+        url, result = pending.popleft()
+        yield url, unwrap(result)
+
+
+def within_budget(fetch, budget):
+    """Оборачивает fetch(url) так, что страница берётся в работу
+    только в пределах бюджета памяти и освобождает его после разбора,
+    в том числе разбора в пуле процессов.
+    """
+    def fetch_within_budget(url):
+        budget.acquire()
+        try:
+            result = fetch(url)
+        except BaseException:
+            budget.release()
+            raise
+        if isinstance(result, Future):
+            result.add_done_callback(budget.release)
+        else:
+            budget.release()
+        return result
+
+    return fetch_within_budget
+
+
+def crawl(session, urls, extractor, workers=DEFAULT_WORKERS,
+          parse_workers=None, state=None, max_rss=None):
+    """Загружает страницы urls и применяет к их HTML функцию extractor.
+
+    Страницы загружаются в пуле из workers потоков. Если задан
+    parse_workers, разбор HTML выполняется в отдельном пуле процессов,
+    и потоки загрузки передают туда только текст страницы. Страницы,
+    не изменившиеся с прошлого запуска (state), повторно не разбираются.
+    С max_rss (мегабайт) новые страницы не загружаются, пока RSS
+    процесса больше бюджета и другие страницы ещё в обработке.
+    Возвращает пары (url, результат extractor) в порядке следования urls.
+    Если страница не загрузилась, вместо результата возвращается
+    исключение RequestException.
+    """
+    parse_pool = None
+    if parse_workers:
+        # Процессы пула запускаются из потоков загрузки. Копия процесса
+        # через fork могла бы унаследовать блокировки logging, urllib3
+        # или sqlite, занятые другими потоками, поэтому процессы
+        # разбора запускаются заново (spawn).
+        parse_pool = ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def fetch(url):
+        response = get_response(session, url)
+        return parse_page(url, response, extractor, parse_pool, state)
+
+    if max_rss:
+        fetch = within_budget(fetch, MemoryBudget(max_rss * MEGABYTE))
+    try:
+        yield from in_order(map_urls(fetch, urls, workers))
+    finally:
+        # shutdown дожидается колбэков, сохраняющих результаты в state.
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
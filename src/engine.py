@@ -0,0 +1,152 @@
+import logging
+import time
+from argparse import Namespace
+from urllib.parse import urljoin
+
+from requests import RequestException
+from tqdm import tqdm
+
+from constants import DEFAULT_WORKERS, QUEUE_POLL_INTERVAL
+from crawler import crawl, extract_page
+from metrics import metrics
+from state import PageState
+from utils import add_msgs_to_logs
+
+
+class ModeSpec:
+    """Описание режима парсера, которое выполняет run_spec.
+
+    url — стартовая страница, links(html) — список элементов со
+    стартовой страницы, header — заголовок таблицы результата.
+    Если задан follow(элемент), по каждому элементу загружается
+    страница по ссылке follow, разбирается функцией page(html),
+    и строка результата строится как row(элемент, url, результат page).
+    Без follow строка строится по самому элементу: row(элемент).
+    summarize(строки) сворачивает строки в итоговую таблицу, state_file
+    хранит хеши разобранных страниц для флага --incremental.
+    dump_item(элемент) и load_item(значение) переводят элемент в значение
+    JSON для очереди шардов и обратно, по умолчанию элемент не меняется.
+    """
+
+    def __init__(self, url, links, header, row, follow=None, page=None,
+                 summarize=None, state_file=None, dump_item=None,
+                 load_item=None):
+        self.url = url
+        self.links = links
+        self.header = header
+        self.row = row
+        self.follow = follow
+        self.page = page
+        self.summarize = summarize
+        self.state_file = state_file
+        self.dump_item = dump_item or same_item
+        self.load_item = load_item or same_item
+
+
+def same_item(item):
+    return item
+
+
+def followed_rows(spec, session, items, cli_args=None):
+    """Загружает страницы по ссылкам элементов и строит строки
+    результата в порядке элементов. Ошибки загрузки пишутся в лог
+    после обхода всех страниц.
+    """
+    state = None
+    if spec.state_file is not None and getattr(
+        cli_args, 'incremental', False
+    ):
+        state = PageState(spec.state_file)
+    urls = [urljoin(spec.url, spec.follow(item)) for item in items]
+    pages = crawl(
+        session, urls, spec.page,
+        getattr(cli_args, 'workers', DEFAULT_WORKERS),
+        getattr(cli_args, 'parse_workers', None), state,
+        max_rss=getattr(cli_args, 'max_rss', None)
+    )
+    err_msg_list = []
+    for item, (url, page) in zip(items, tqdm(pages, total=len(urls))):
+        if isinstance(page, RequestException):
+            err_msg_list.append(page)
+            continue
+        yield spec.row(item, url, page)
+    if err_msg_list:
+        add_msgs_to_logs(err_msg_list, logging.error)
+    if state is not None:
+        state.save()
+        logging.info(f'Разобрано изменившихся страниц: {len(state.changed)}')
+
+
+def process_shards(queue, session, cli_args, specs, wait=False,
+                   idle_timeout=0):
+    """Обрабатывает шарды очереди режимов specs ({режим: ModeSpec})
+    и возвращает их число. С wait ждёт, пока другие обработчики
+    завершат взятые шарды, и забирает шарды, срок которых истёк.
+    Без свободных шардов очередь опрашивается ещё idle_timeout секунд:
+    обработчики можно запустить раньше, чем режим заполнит очередь.
+    Флаг --incremental в шардах не действует: несколько процессов
+    не могут вести общий файл состояния.
+    """
+    shard_args = Namespace(**{**vars(cli_args), 'incremental': False})
+    processed = 0
+    idle_since = time.monotonic()
+    while True:
+        shard = queue.claim(list(specs))
+        if shard is None:
+            waiting = wait and any(map(queue.pending, specs))
+            if not waiting and (
+                time.monotonic() - idle_since >= idle_timeout
+            ):
+                return processed
+            time.sleep(QUEUE_POLL_INTERVAL)
+            continue
+        shard_id, mode, items = shard
+        spec = specs[mode]
+        queue.complete(shard_id, list(followed_rows(
+            spec, session, list(map(spec.load_item, items)), shard_args
+        )))
+        metrics.increment('queue_shards')
+        processed += 1
+        idle_since = time.monotonic()
+
+
+def sharded_rows(spec, session, items, cli_args):
+    """Делит элементы на шарды очереди --queue, обрабатывает шарды
+    вместе с командами worker и отдаёт строки всех шардов в порядке
+    элементов.
+    """
+    from work_queue import WorkQueue
+
+    queue = WorkQueue(cli_args.queue)
+    try:
+        shards = queue.enqueue(
+            cli_args.mode, list(map(spec.dump_item, items)),
+            cli_args.shard_size
+        )
+        logging.info(f'В очередь {cli_args.queue} добавлено шардов: {shards}')
+        processed = process_shards(
+            queue, session, cli_args, {cli_args.mode: spec}, wait=True
+        )
+        logging.info(f'Обработано шардов в этом процессе: {processed}')
+        yield from queue.rows(cli_args.mode)
+    finally:
+        queue.close()
+
+
+def run_spec(spec, session, cli_args=None):
+    """Генератор строк таблицы результата режима, описанного spec.
+    Первой строкой отдаётся заголовок, остальные — по мере загрузки
+    страниц или, если задан summarize, после свёртки всех строк.
+    С флагом --queue страницы загружаются шардами через очередь.
+    """
+    items = list(extract_page(session, spec.url, spec.links))
+    yield spec.header
+    if spec.follow is None:
+        rows = map(spec.row, items)
+    elif getattr(cli_args, 'queue', None) is not None:
+        rows = sharded_rows(spec, session, items, cli_args)
+    else:
+        rows = followed_rows(spec, session, items, cli_args)
+    if spec.summarize is not None:
+        rows = spec.summarize(rows)
+    yield from rows
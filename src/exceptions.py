@@ -11,3 +11,7 @@ class ParserFindTextException(Exception):
 
 class ResponseIsNoneException(RequestException):
     """Вызывается в случае невозможности получить response."""
+
+
+class OptionalDependencyException(ImportError):
+    """Вызывается, когда для выбранного режима не установлен пакет."""
@@ -0,0 +1,185 @@
+import logging
+from contextlib import contextmanager
+
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+
+from constants import PARSE_CHUNK_SIZE, PDF_A4_PATTERN, PEP_NUMBER_PATTERN
+from exceptions import ParserFindTagException
+from utils import find_tag
+
+# Фрагменты страниц, которые нужны режимам парсера. BeautifulSoup строит
+# дерево только для этих тегов, остальная разметка пропускается.
+PEP_CARD_STRAINER = SoupStrainer('dl')
+WHATS_NEW_INDEX_STRAINER = SoupStrainer(
+    'section', attrs={'id': 'what-s-new-in-python'}
+)
+SIDEBAR_STRAINER = SoupStrainer(
+    'div', attrs={'class': 'sphinxsidebarwrapper'}
+)
+DOWNLOAD_TABLE_STRAINER = SoupStrainer('table', attrs={'class': 'docutils'})
+
+
+@contextmanager
+def parse_only(html, strainer):
+    """Строит дерево BeautifulSoup только из тегов strainer и
+    разрушает его после выхода из блока: дерево содержит циклические
+    ссылки и без decompose освобождается только сборщиком мусора.
+    Значения из дерева нужно копировать в str до выхода из блока.
+    """
+    soup = BeautifulSoup(html, features='lxml', parse_only=strainer)
+    try:
+        yield soup
+    finally:
+        soup.decompose()
+
+
+class PepIndexEntry:
+    """Строка таблицы PEP по категориям: номер, категория
+    (аббревиатура типа и статуса) и ссылка на страницу PEP.
+    """
+
+    __slots__ = ('number', 'category', 'url')
+
+    def __init__(self, number, category, url):
+        self.number = number
+        self.category = category
+        self.url = url
+
+
+def extract_pep_index(html):
+    """Возвращает {номер PEP: PepIndexEntry} в порядке таблиц PEP
+    по категориям за один проход по строкам таблиц. Категория и ссылка
+    берутся из одной строки, поэтому не могут сместиться относительно
+    друг друга. PEP, который встречается в нескольких таблицах,
+    учитывается по первой строке.
+    """
+    root = etree.fromstring(html, etree.HTMLParser())
+    section = None if root is None else root.find(
+        ".//section[@id='index-by-category']"
+    )
+    if section is None:
+        error_msg = "Не найден тег section {'id': 'index-by-category'}"
+        logging.error(error_msg)
+        raise ParserFindTagException(error_msg)
+    entries = {}
+    for row in section.iter('tr'):
+        abbr = row.find('.//abbr')
+        link = row.find(".//a[@class='pep reference internal']")
+        if abbr is None or link is None:
+            continue
+        url = link.get('href')
+        number = int(PEP_NUMBER_PATTERN.search(url).group(1))
+        if number not in entries:
+            entries[number] = PepIndexEntry(number, element_text(abbr), url)
+    return entries
+
+
+def extract_pep_card(html):
+    """Возвращает статус, тип, авторов и дату создания PEP
+    из карточки в начале страницы.
+    """
+    with parse_only(html, PEP_CARD_STRAINER) as soup:
+        dl_tag = soup.find('dl')
+        dd_tag = dl_tag.dd
+        while not dd_tag.abbr:
+            dd_tag = dd_tag.find_next_sibling('dd')
+        fields = {
+            dt_tag.text.strip().rstrip(':'):
+                dt_tag.find_next_sibling('dd').text.strip()
+            for dt_tag in dl_tag('dt', recursive=False)
+        }
+        return (
+            str(dd_tag.string),
+            fields.get('Type', ''),
+            fields.get('Author', ''),
+            fields.get('Created', ''),
+        )
+
+
+def extract_whats_new_links(html):
+    """Возвращает ссылки на статьи об изменениях в версиях Python."""
+    with parse_only(html, WHATS_NEW_INDEX_STRAINER) as soup:
+        main_div = find_tag(
+            soup, 'section', attrs={'id': 'what-s-new-in-python'}
+        )
+        div_with_ul = find_tag(
+            main_div, 'div', attrs={'class': 'toctree-wrapper'}
+        )
+        sections_by_python = div_with_ul.find_all(
+            'li', attrs={'class': 'toctree-l1'}
+        )
+        return [section.find('a')['href'] for section in sections_by_python]
+
+
+def first_elements(html, tags):
+    """Потоково разбирает html частями по PARSE_CHUNK_SIZE символов
+    и возвращает {тег: первый элемент с этим тегом}. Разбор
+    останавливается, как только закрыты первые элементы всех тегов,
+    остаток страницы не разбирается.
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), tag=tags)
+    first = {}
+    closed = set()
+
+    def read_events():
+        for event, element in parser.read_events():
+            if event == 'start':
+                first.setdefault(element.tag, element)
+            elif first.get(element.tag) is element:
+                closed.add(element.tag)
+        return len(closed) == len(tags)
+
+    for start in range(0, len(html), PARSE_CHUNK_SIZE):
+        parser.feed(html[start:start + PARSE_CHUNK_SIZE])
+        if read_events():
+            return first
+    parser.close()
+    read_events()
+    return first
+
+
+def element_text(element):
+    """Текст элемента со всеми вложенными тегами, как `Tag.text` в bs4:
+    без комментариев и содержимого script и style.
+    """
+    etree.strip_elements(element, 'script', 'style', with_tail=False)
+    return etree.tostring(
+        element, method='text', encoding='unicode', with_tail=False
+    )
+
+
+def extract_whats_new(html):
+    """Возвращает заголовок статьи и текст первого списка определений.
+    Страница разбирается только до конца первых тегов h1 и dl.
+    """
+    first = first_elements(html, ('h1', 'dl'))
+    for tag in ('h1', 'dl'):
+        if tag not in first:
+            error_msg = f'Не найден тег {tag} на странице статьи'
+            logging.error(error_msg)
+            raise ParserFindTagException(error_msg)
+    return (
+        element_text(first['h1']),
+        element_text(first['dl']).replace('\n', ' ')
+    )
+
+
+def extract_version_links(html):
+    """Возвращает пары (ссылка, текст) из списка версий документации."""
+    with parse_only(html, SIDEBAR_STRAINER) as soup:
+        sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
+        for ul in sidebar.find_all('ul'):
+            if 'All versions' in ul.text:
+                return [
+                    (a_tag.get('href'), a_tag.text) for a_tag in ul('a')
+                ]
+    raise ParserFindTagException('Список версий Python не найден')
+
+
+def extract_pdf_a4_link(html):
+    """Возвращает ссылку на архив документации в формате PDF A4."""
+    with parse_only(html, DOWNLOAD_TABLE_STRAINER) as soup:
+        table_tag = find_tag(soup, 'table', attrs={'class': 'docutils'})
+        pdf_a4_tag = table_tag.find('a', {'href': PDF_A4_PATTERN})
+        return pdf_a4_tag['href']
@@ -1,142 +1,246 @@
+import datetime as dt
 import logging
-import re
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
-import requests_cache
-from requests import RequestException
-from tqdm import tqdm
-
-from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, DOWNLOADS, EXPECTED_STATUS, MAIN_DOC_URL,
-                       MAIN_PEPS_URL)
-from exceptions import ParserFindTagException
+from configs import (configure_argument_parser, configure_logging,
+                     configure_session)
+from constants import (BASE_DIR, DATETIME_FORMAT, DOWNLOADS, MAIN_DOC_URL,
+                       METRICS_DIR, METRICS_FORMAT_TO_EXTENSION, MODE_ALL,
+                       PEP_INDEX_FILE, SERVICE_REFRESH_INTERVALS)
+from memory import trace_memory
+from metrics import metrics
 from outputs import control_output
-from utils import add_msgs_to_logs, create_bsoup_from_url, find_tag
+from pep_index import PepIndex
+
+# requests, requests_cache, bs4 и tqdm импортируются внутри режимов:
+# справка, pep-query и разбор аргументов не тратят время на их загрузку.
+# Режимы с таблицей результата описаны в specs.py и выполняются
+# общим исполнителем engine.run_spec.
 
 
-def whats_new(session):
-    """Формирует список с ссылками на актуальные
+def whats_new(session, cli_args=None):
+    """Генератор строк со ссылками на актуальные
     статьи об изменениях в версиях Python.
     """
-    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    soup = create_bsoup_from_url(session, whats_new_url)
-    main_div = find_tag(soup, 'section', attrs={'id': 'what-s-new-in-python'})
-    div_with_ul = find_tag(main_div, 'div', attrs={'class': 'toctree-wrapper'})
-    sections_by_python = div_with_ul.find_all(
-        'li', attrs={'class': 'toctree-l1'}
-    )
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор')]
-    err_msg_list = []
-    for section in tqdm(sections_by_python):
-        version_a_tag = section.find('a')
-        href = version_a_tag['href']
-        version_link = urljoin(whats_new_url, href)
-        try:
-            soup = create_bsoup_from_url(session, version_link)
-        except RequestException as e:
-            err_msg_list.append(e)
-            continue
-        h1 = find_tag(soup, 'h1')
-        dl = find_tag(soup, 'dl')
-        dl_text = dl.text.replace('\n', ' ')
-        results.append((version_link, h1.text, dl_text))
-    if err_msg_list:
-        add_msgs_to_logs(err_msg_list, logging.error)
-    return results
-
-
-def latest_versions(session):
-    """Формирует список с версиями Python, их статусом и
+    from engine import run_spec
+    from specs import WHATS_NEW_SPEC
+
+    return run_spec(WHATS_NEW_SPEC, session, cli_args)
+
+
+def latest_versions(session, cli_args=None):
+    """Генератор строк с версиями Python, их статусом и
     ссылкой на документацию.
     """
-    soup = create_bsoup_from_url(session, MAIN_DOC_URL)
-    sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
-    ul_tags = sidebar.find_all('ul')
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise ParserFindTagException('Список версий Python не найден')
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        link = a_tag.get('href')
-        pat = re.search(pattern, a_tag.text)
-        if pat:
-            version = pat.group('version')
-            status = pat.group('status')
-        else:
-            version = a_tag.text
-            status = ''
-        results.append((link, version, status))
-    return results
+    from engine import run_spec
+    from specs import LATEST_VERSIONS_SPEC
+
+    return run_spec(LATEST_VERSIONS_SPEC, session, cli_args)
 
 
-def download(session):
+def download(session, cli_args=None):
     """Функция загружает последнюю версию Python."""
+    from crawler import extract_page
+    from extractors import extract_pdf_a4_link
+    from utils import download_file
+
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    soup = create_bsoup_from_url(session, downloads_url)
-    table_tag = soup.find('table', class_='docutils')
-    pdf_a4_tag = table_tag.find('a', {'href': re.compile(r'.+pdf-a4\.zip$')})
-    pdf_a4_link = pdf_a4_tag['href']
+    pdf_a4_link = extract_page(session, downloads_url, extract_pdf_a4_link)
     archive_url = urljoin(downloads_url, pdf_a4_link)
     filename = archive_url.split('/')[-1]
     download_dir = BASE_DIR / DOWNLOADS
     download_dir.mkdir(exist_ok=True)
     archive_path = download_dir / filename
-    response = session.get(archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(f'Архив был загружен и сохранён: {archive_path}')
-
-
-def pep(session):
-    """Функция считает количество PEP в каждом статусе и формирует таблицу."""
-    soup = create_bsoup_from_url(session, MAIN_PEPS_URL)
-    section_tag = find_tag(soup, 'section', attrs={'id': 'index-by-category'})
-    abbr_tags = section_tag.find_all('abbr')
-    links_tags = section_tag.find_all('a', class_='pep reference internal')
-    abbr_list = [abbr.text for abbr in abbr_tags]
-    links_list_with_dublicates = [link['href'] for link in links_tags]
-    links_list = list(dict.fromkeys(links_list_with_dublicates))
-    abbr_links_list = [
-        (
-            abbr_list[i], urljoin(MAIN_PEPS_URL, links_list[i])
-        ) for i in range(len(links_list))
-    ]
-    total_peps = 0
-    dict_statuses = dict()
-    results = [('Статус', 'Количество',)]
-    err_msg_list = []
-    incorrect_status_msgs = []
-    for element in tqdm(abbr_links_list):
-        try:
-            soup = create_bsoup_from_url(session, element[1])
-        except RequestException as e:
-            err_msg_list.append(e)
-            continue
-        dl_tag = soup.find('dl')
-        dd_tag = dl_tag.dd
-        while not dd_tag.abbr:
-            dd_tag = dd_tag.find_next_sibling('dd')
-        status_pep = dd_tag.string
-        if status_pep not in EXPECTED_STATUS[element[0][1:]]:
-            inc_status_msg = (
-                f'Несовпадающие статусы:\n{element[1]}\n'
-                f'Статус в карточке: {status_pep}\n'
-                f'Ожидаемые статусы: {EXPECTED_STATUS[element[0][1:]]}'
+    if download_file(session, archive_url, archive_path):
+        logging.info(f'Архив был загружен и сохранён: {archive_path}')
+    else:
+        logging.info(f'Архив не изменился с прошлой загрузки: {archive_path}')
+
+
+def pep(session, cli_args=None):
+    """Функция считает количество PEP в каждом статусе. Генератор строк
+    таблицы: строки со статусами отдаются после загрузки всех страниц.
+    Страницы PEP загружаются параллельно в cli_args.workers потоков.
+    С флагом --incremental разбираются только изменившиеся страницы,
+    статусы остальных берутся из состояния прошлого запуска.
+    """
+    from engine import run_spec
+    from specs import PEP_SPEC
+
+    return run_spec(PEP_SPEC, session, cli_args)
+
+
+def pep_query(cli_args):
+    """Генератор строк с PEP из локального индекса, подходящих под
+    фильтры --status, --type и --author. Сеть не используется.
+    """
+    yield 'Номер', 'Категория', 'Статус', 'Тип', 'Авторы', 'Создан', 'Ссылка'
+    pep_index = PepIndex(PEP_INDEX_FILE)
+    try:
+        yield from pep_index.query(
+            cli_args.status, cli_args.type, cli_args.author
+        )
+    finally:
+        pep_index.close()
+
+
+def cache_stats(cli_args):
+    """Генератор строк со статистикой кеша pagestore."""
+    from page_store import PageStore, page_store_path
+
+    yield 'Показатель', 'Значение'
+    page_store = PageStore(page_store_path(cli_args.cache_name))
+    try:
+        yield from page_store.stats().items()
+    finally:
+        page_store.close()
+
+
+def cache_prune(cli_args):
+    """Удаляет из кеша pagestore давно не читавшиеся ответы, пока его
+    размер больше --max-cache-size мегабайт.
+    """
+    from page_store import PageStore, page_store_path
+
+    yield 'Показатель', 'Значение'
+    page_store = PageStore(page_store_path(cli_args.cache_name))
+    try:
+        removed, freed = page_store.evict(cli_args.max_cache_size * 2 ** 20)
+        page_store.vacuum()
+        yield 'removed_pages', removed
+        yield 'freed_bytes', freed
+        yield 'stored_bytes', page_store.size
+        yield 'file_bytes', page_store.path.stat().st_size
+    finally:
+        page_store.close()
+
+
+def serve(cli_args):
+    """Служба: режимы обновляются по расписанию SERVICE_REFRESH_INTERVALS
+    с одной общей сессией, последние результаты отдаются по HTTP
+    в формате JSON на --host и --port.
+    """
+    from service import serve_results
+
+    session = configure_session(cli_args)
+    try:
+        serve_results(
+            lambda mode: collect_results(
+                session, mode_namespace(cli_args, mode)
+            ),
+            SERVICE_REFRESH_INTERVALS, cli_args.host, cli_args.port
+        )
+    finally:
+        session.close()
+
+
+def worker(cli_args):
+    """Обработчик очереди --queue: загружает страницы свободных
+    шардов режимов, запущенных с тем же флагом --queue. Ждёт шарды
+    и завершается, если их нет дольше --idle-timeout секунд.
+    Процессов-обработчиков может быть несколько, в том числе на разных
+    машинах с общим файлом очереди.
+    """
+    from engine import process_shards
+    from specs import MODE_SPECS
+    from work_queue import WorkQueue
+
+    if cli_args.queue is None:
+        logging.error('Для команды worker нужен флаг --queue')
+        return
+    session = configure_session(cli_args)
+    queue = WorkQueue(cli_args.queue)
+    try:
+        processed = process_shards(
+            queue, session, cli_args, MODE_SPECS,
+            idle_timeout=cli_args.idle_timeout
+        )
+    finally:
+        queue.close()
+        session.close()
+    logging.info(f'Обработано шардов: {processed}')
+
+
+def output_results(results, cli_args):
+    if results is None:
+        return
+    with metrics.timer('run', cli_args.mode):
+        control_output(
+            metrics.timed(results, 'mode', cli_args.mode), cli_args
+        )
+
+
+def collect_results(session, cli_args):
+    """Выполняет режим и собирает строки результата в список."""
+    with metrics.timer('run', cli_args.mode):
+        results = MODE_TO_FUNCTION[cli_args.mode](session, cli_args)
+        if results is None:
+            return None
+        return list(metrics.timed(results, 'mode', cli_args.mode))
+
+
+def mode_namespace(cli_args, mode):
+    """Копия аргументов командной строки с одним режимом в mode:
+    по нему способ вывода выбирает имя файла с результатами.
+    """
+    return Namespace(**{**vars(cli_args), 'mode': mode})
+
+
+def run_modes(session, modes, cli_args):
+    """Выполняет режимы с одной общей сессией и пулом соединений.
+    Один режим выводит строки по мере получения. Несколько режимов
+    выполняются одновременно в отдельных потоках, а результаты каждого
+    выводятся своим выводом в порядке перечисления режимов.
+    """
+    if len(modes) == 1:
+        mode_args = mode_namespace(cli_args, modes[0])
+        output_results(MODE_TO_FUNCTION[modes[0]](session, mode_args),
+                       mode_args)
+        return
+    with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+        runs = [
+            (mode_args, executor.submit(collect_results, session, mode_args))
+            for mode_args in (
+                mode_namespace(cli_args, mode) for mode in modes
             )
-            incorrect_status_msgs.append(inc_status_msg)
-        dict_statuses[status_pep] = dict_statuses.get(status_pep, 0) + 1
-        total_peps += 1
-    if err_msg_list:
-        add_msgs_to_logs(err_msg_list, logging.error)
-    if incorrect_status_msgs:
-        add_msgs_to_logs(incorrect_status_msgs, logging.info)
-    results.extend(list(dict_statuses.items()))
-    results.append(('Total', total_peps,))
-    return results
+        ]
+        for mode_args, future in runs:
+            try:
+                results = future.result()
+            except Exception as e:
+                logging.exception(
+                    f'Ошибка режима {mode_args.mode}: вызвано исключение '
+                    f'{e.__class__.__name__}'
+                )
+                continue
+            if results is not None:
+                with metrics.timer('run', mode_args.mode):
+                    control_output(results, mode_args)
+
+
+def select_modes(selected, arg_parser):
+    """Раскрывает `all` в список всех режимов и убирает повторы.
+    Команды запускаются только по одной.
+    """
+    modes = []
+    for mode in selected:
+        modes.extend(MODE_TO_FUNCTION if mode == MODE_ALL else [mode])
+    modes = list(dict.fromkeys(modes))
+    if len(modes) > 1 and any(mode in COMMAND_TO_FUNCTION for mode in modes):
+        arg_parser.error('Команды запускаются отдельно от режимов парсера')
+    return modes
+
+
+def save_metrics(cli_args, modes):
+    metrics_dir = BASE_DIR / METRICS_DIR
+    now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
+    extension = METRICS_FORMAT_TO_EXTENSION[cli_args.metrics]
+    file_name = '+'.join(modes)
+    file_path = metrics_dir / f'{file_name}_{now_formatted}.{extension}'
+    metrics.dump(file_path, cli_args.metrics)
+    logging.info(f'Метрики работы парсера сохранены: {file_path}')
 
 
 MODE_TO_FUNCTION = {
@@ -146,21 +250,46 @@ MODE_TO_FUNCTION = {
     'pep': pep
 }
 
+COMMAND_TO_FUNCTION = {
+    'pep-query': pep_query,
+    'serve': serve,
+    'cache-stats': cache_stats,
+    'cache-prune': cache_prune,
+    'worker': worker,
+}
+
 
 def main():
     try:
         configure_logging()
         logging.info('Парсер запущен!')
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+        arg_parser = configure_argument_parser(
+            (*MODE_TO_FUNCTION, *COMMAND_TO_FUNCTION, MODE_ALL)
+        )
         args = arg_parser.parse_args()
         logging.info(f'Аргументы командной строки: {args}')
-        session = requests_cache.CachedSession()
-        if args.clear_cache:
-            session.cache.clear()
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results is not None:
-            control_output(results, args)
+        modes = select_modes(args.mode, arg_parser)
+        if modes[0] in COMMAND_TO_FUNCTION:
+            command_args = mode_namespace(args, modes[0])
+            output_results(
+                COMMAND_TO_FUNCTION[modes[0]](command_args), command_args
+            )
+        else:
+            from archive import record_archive
+
+            session = configure_session(args)
+            try:
+                if args.clear_cache:
+                    session.cache.clear()
+                with record_archive(session, args.record), trace_memory(
+                    '+'.join(modes), args.trace_memory
+                ):
+                    run_modes(session, modes, args)
+            finally:
+                # Закрытие кеша сохраняет время чтения страниц pagestore.
+                session.close()
+        if args.metrics:
+            save_metrics(args, modes)
 
     except Exception as e:
         logging.exception(
@@ -0,0 +1,114 @@
+import gc
+import logging
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from constants import MEMORY_RESUME_RATIO, MEMORY_WAIT_TIMEOUT, STATM_FILE
+from metrics import metrics
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MEGABYTE = 2 ** 20
+
+
+def current_rss():
+    """Текущий размер резидентной памяти процесса в байтах
+    по /proc/self/statm или None, если файла нет (не Linux).
+    """
+    try:
+        with open(STATM_FILE) as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def peak_rss():
+    """Пиковый размер резидентной памяти процесса в байтах
+    или None, если модуль resource недоступен (Windows).
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryBudget:
+    """Ограничивает число страниц в обработке по объёму памяти.
+
+    Когда RSS процесса превышает max_rss байт, один раз запускается
+    сборщик мусора, и новые страницы берутся в работу, только если
+    в работе нет ни одной страницы. Параллельная обработка
+    возобновляется, когда RSS опустится ниже доли MEMORY_RESUME_RATIO
+    бюджета: освобождённую память CPython редко возвращает системе,
+    и без запаса обход оставался бы последовательным.
+    """
+
+    def __init__(self, max_rss):
+        self.max_rss = max_rss
+        self.resume_rss = max_rss * MEMORY_RESUME_RATIO
+        self.in_flight = 0
+        self.throttled = False
+        self.condition = threading.Condition()
+
+    def start_throttling(self):
+        """Отмечает превышение бюджета. Возвращает True только для
+        потока, который первым заметил превышение.
+        """
+        with self.condition:
+            if self.throttled or not self.in_flight:
+                return False
+            rss = current_rss()
+            if rss is None or rss <= self.max_rss:
+                return False
+            self.throttled = True
+            metrics.increment('memory_waits')
+            return True
+
+    def acquire(self):
+        if self.start_throttling():
+            gc.collect()
+        with self.condition:
+            while self.throttled and self.in_flight:
+                rss = current_rss()
+                if rss is None or rss < self.resume_rss:
+                    self.throttled = False
+                    break
+                self.condition.wait(MEMORY_WAIT_TIMEOUT)
+            self.in_flight += 1
+
+    def release(self, *args):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+
+@contextmanager
+def trace_memory(key, enabled=True):
+    """Записывает в лог и метрики пик памяти Python-объектов
+    (tracemalloc) и пик RSS процесса за время работы блока.
+    """
+    if not enabled:
+        yield
+        return
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+        metrics.set_value('peak_traced_mb', peak / MEGABYTE, key)
+        message = f'Пик памяти {key}: объекты Python {peak / MEGABYTE:.1f} МБ'
+        rss = peak_rss()
+        if rss is not None:
+            metrics.set_value('peak_rss_mb', rss / MEGABYTE, key)
+            message += f', RSS процесса {rss / MEGABYTE:.1f} МБ'
+        logging.info(message)
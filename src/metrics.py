@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from constants import METRICS_JSON, METRICS_PROMETHEUS, METRICS_PREFIX
+
+
+class Metrics:
+    """Время этапов работы парсера и счётчики событий.
+
+    Время копится по этапам (fetch, headers, transfer, parse, mode,
+    run) в целом и отдельно по ключу: URL страницы или режиму парсера.
+    Этап mode — получение строк результата, run — работа режима
+    вместе с выводом результата.
+    Методы можно вызывать из потоков загрузки одновременно.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(float)
+        self.counters = Counter()
+        self.details = defaultdict(dict)
+
+    def add_time(self, phase, seconds, key=None):
+        with self.lock:
+            self.timings[phase] += seconds
+            if key is not None:
+                self.details[key][phase] = (
+                    self.details[key].get(phase, 0) + seconds
+                )
+
+    @contextmanager
+    def timer(self, phase, key=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - started, key)
+
+    def timed(self, rows, phase, key=None):
+        """Отдаёт элементы rows, учитывая время их получения в phase."""
+        iterator = iter(rows)
+        while True:
+            with self.timer(phase, key):
+                row = next(iterator, None)
+            if row is None:
+                return
+            yield row
+
+    def set_value(self, name, value, key):
+        with self.lock:
+            self.details[key][name] = value
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def record_response(self, url, response, seconds):
+        """Учитывает загрузку страницы: время до получения заголовков,
+        время передачи тела и попадание в кеш.
+        """
+        from_cache = getattr(response, 'from_cache', False)
+        self.increment('cache_hits' if from_cache else 'cache_misses')
+        self.add_time('fetch', seconds, url)
+        if not from_cache:
+            headers_time = min(response.elapsed.total_seconds(), seconds)
+            self.add_time('headers', headers_time, url)
+            self.add_time('transfer', seconds - headers_time, url)
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'timings': dict(self.timings),
+                'counters': dict(self.counters),
+                'details': dict(self.details),
+            }
+
+    def as_prometheus(self):
+        with self.lock:
+            lines = [
+                f'{METRICS_PREFIX}_phase_seconds{{phase="{phase}"}} {seconds}'
+                for phase, seconds in sorted(self.timings.items())
+            ]
+            lines.extend(
+                f'{METRICS_PREFIX}_{name}_total {value}'
+                for name, value in sorted(self.counters.items())
+            )
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, file_path, metrics_format=METRICS_JSON):
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            if metrics_format == METRICS_PROMETHEUS:
+                f.write(self.as_prometheus())
+            else:
+                json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+
+
+metrics = Metrics()
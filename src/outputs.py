@@ -1,11 +1,12 @@
 import csv
 import datetime as dt
+import json
 import logging
 
-from prettytable import PrettyTable
-
-from constants import (BASE_DIR, DATETIME_FORMAT, OUTPUT_FILE,
-                       OUTPUT_PRETTY_TABLE, RESULTS)
+from constants import (ARROW_COLUMN_TYPES, BASE_DIR, DATETIME_FORMAT,
+                       OUTPUT_BATCH_SIZE, OUTPUT_FEATHER, OUTPUT_FILE,
+                       OUTPUT_JSONL, OUTPUT_PARQUET, OUTPUT_PRETTY_TABLE,
+                       RESULTS)
 
 
 def control_output(results, cli_args):
@@ -14,6 +15,9 @@ def control_output(results, cli_args):
     OUTPUT_FUNCTION = {
         OUTPUT_PRETTY_TABLE: pretty_output,
         OUTPUT_FILE: file_output,
+        OUTPUT_JSONL: jsonl_output,
+        OUTPUT_FEATHER: feather_output,
+        OUTPUT_PARQUET: parquet_output,
         None: default_output
     }
     OUTPUT_FUNCTION[output](results, cli_args)
@@ -22,11 +26,14 @@ def control_output(results, cli_args):
 def default_output(*args):
     results, _ = args
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 def pretty_output(*args):
+    from prettytable import PrettyTable
+
     results, _ = args
+    results = list(results)
     table = PrettyTable()
     table.field_names = results[0]
     table.align = 'l'
@@ -34,15 +41,116 @@ def pretty_output(*args):
     print(table)
 
 
-def file_output(results, cli_args):
+def get_file_path(cli_args, extension):
     results_dir = BASE_DIR / RESULTS
     results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
     now = dt.datetime.now()
     now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = results_dir / file_name
+    file_name = f'{parser_mode}_{now_formatted}.{extension}'
+    return results_dir / file_name
+
+
+def batched(rows, size=OUTPUT_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def file_output(results, cli_args):
+    file_path = get_file_path(cli_args, 'csv')
     with open(file_path, 'w', encoding='utf-8') as f:
         writer = csv.writer(f, dialect='unix')
-        writer.writerows(results)
+        for row in results:
+            writer.writerow(row)
+            f.flush()
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def jsonl_output(results, cli_args):
+    """Записывает строки результата в формате JSON Lines: по одному
+    объекту с ключами из строки заголовка на строку файла.
+    """
+    file_path = get_file_path(cli_args, 'jsonl')
+    rows = iter(results)
+    header = next(rows)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for batch in batched(rows):
+            f.writelines(
+                json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+                for row in batch
+            )
+            f.flush()
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def import_pyarrow():
+    from exceptions import OptionalDependencyException
+
+    try:
+        import pyarrow
+    except ImportError:
+        raise OptionalDependencyException(
+            'Для вывода в форматах feather и parquet установите pyarrow'
+        )
+    return pyarrow
+
+
+def arrow_schema(pa, mode, header):
+    """Схема колонок режима по ARROW_COLUMN_TYPES, остальные
+    колонки — строки.
+    """
+    types = ARROW_COLUMN_TYPES.get(mode, ())
+    return pa.schema(
+        (name, pa.type_for_alias(types[i] if i < len(types) else 'string'))
+        for i, name in enumerate(header)
+    )
+
+
+def arrow_array(pa, column, field):
+    if pa.types.is_string(field.type):
+        column = [None if value is None else str(value) for value in column]
+    return pa.array(column, type=field.type)
+
+
+def arrow_output(results, file_path, open_writer, mode):
+    """Записывает строки результата в колоночный файл пачками по
+    OUTPUT_BATCH_SIZE строк. Типы колонок заданы для режима заранее,
+    поэтому не зависят от значений в первой пачке.
+    """
+    pa = import_pyarrow()
+    rows = iter(results)
+    schema = arrow_schema(pa, mode, next(rows))
+    writer = open_writer(str(file_path), schema)
+    try:
+        for batch in batched(rows):
+            arrays = [
+                arrow_array(pa, column, field)
+                for column, field in zip(zip(*batch), schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    finally:
+        writer.close()
     logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def feather_output(results, cli_args):
+    pa = import_pyarrow()
+    arrow_output(
+        results, get_file_path(cli_args, 'feather'), pa.ipc.new_file,
+        cli_args.mode
+    )
+
+
+def parquet_output(results, cli_args):
+    import_pyarrow()
+    import pyarrow.parquet as pq
+    arrow_output(
+        results, get_file_path(cli_args, 'parquet'), pq.ParquetWriter,
+        cli_args.mode
+    )
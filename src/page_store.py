@@ -0,0 +1,309 @@
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from hashlib import sha256
+from pathlib import Path
+
+from requests_cache.backends.base import BaseCache, BaseStorage
+from requests_cache.backends.sqlite import SQLiteDict
+from requests_cache.models import CachedHTTPResponse
+
+from constants import (PAGE_STORE_ACCESS_BATCH,
+                       PAGE_STORE_COMPRESSION_LEVEL,
+                       PAGE_STORE_DICTIONARY_SIZE, PAGE_STORE_SUFFIX,
+                       PAGE_STORE_TRAINING_SAMPLES)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS blobs (
+    hash BLOB PRIMARY KEY,
+    dictionary INTEGER,
+    raw_size INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    hash BLOB NOT NULL,
+    meta BLOB NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+'''
+SELECT_SIZE = '''
+SELECT
+    (SELECT COALESCE(SUM(size), 0) FROM blobs)
+    + (SELECT COALESCE(SUM(LENGTH(meta)), 0) FROM responses)
+    + (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries)
+'''
+
+
+def page_store_path(cache_name):
+    return Path(f'{cache_name}{PAGE_STORE_SUFFIX}')
+
+
+def train_dictionary(samples, size=PAGE_STORE_DICTIONARY_SIZE):
+    """Собирает словарь zlib из строк, которые повторяются в нескольких
+    страницах-образцах. Самые частые строки ставятся в конец словаря:
+    zlib кодирует близкие совпадения короче.
+    """
+    counts = Counter(
+        line
+        for sample in samples
+        for line in set(sample.splitlines(keepends=True))
+    )
+    dictionary = bytearray()
+    for line, count in counts.most_common():
+        if count < 2:
+            break
+        if len(dictionary) + len(line) <= size:
+            dictionary[:0] = line
+    return bytes(dictionary)
+
+
+class PageStore(BaseStorage):
+    """Хранилище ответов requests_cache с дедупликацией тел страниц.
+
+    Тело ответа хранится один раз по хешу содержимого, сжатое zlib
+    со словарём, обученным на первых сохранённых страницах. Заголовки
+    и прочие поля ответа хранятся отдельно и ссылаются на тело по хешу.
+    Когда размер хранилища превышает max_size байт, удаляются ответы,
+    которые дольше всего не читались. Время чтения копится в памяти
+    и записывается в базу пачками, при записи ответа и при закрытии.
+    """
+
+    def __init__(self, path, max_size=None, **kwargs):
+        super().__init__(serializer='pickle', **kwargs)
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+        self.dictionaries = dict(
+            self.connection.execute('SELECT id, data FROM dictionaries')
+        )
+        self.size = self.connection.execute(SELECT_SIZE).fetchone()[0]
+        self.accessed = {}
+
+    def compress(self, content):
+        if not self.dictionaries:
+            return None, zlib.compress(content, PAGE_STORE_COMPRESSION_LEVEL)
+        dictionary_id = max(self.dictionaries)
+        compressor = zlib.compressobj(
+            PAGE_STORE_COMPRESSION_LEVEL,
+            zdict=self.dictionaries[dictionary_id]
+        )
+        return dictionary_id, compressor.compress(content) + compressor.flush()
+
+    def decompress(self, dictionary_id, data):
+        if dictionary_id is None:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(
+            zdict=self.dictionaries[dictionary_id]
+        )
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def train(self):
+        """Обучает словарь на сохранённых страницах, когда их набралось
+        PAGE_STORE_TRAINING_SAMPLES. Новые тела сжимаются со словарём.
+        """
+        rows = self.connection.execute(
+            'SELECT dictionary, data FROM blobs LIMIT ?',
+            (PAGE_STORE_TRAINING_SAMPLES,)
+        ).fetchall()
+        if len(rows) < PAGE_STORE_TRAINING_SAMPLES:
+            return
+        dictionary = train_dictionary(
+            self.decompress(dictionary_id, data)
+            for dictionary_id, data in rows
+        )
+        cursor = self.connection.execute(
+            'INSERT INTO dictionaries (data) VALUES (?)', (dictionary,)
+        )
+        self.dictionaries[cursor.lastrowid] = dictionary
+        self.size += len(dictionary)
+
+    def acquire_blob(self, content):
+        digest = sha256(content).digest()
+        updated = self.connection.execute(
+            'UPDATE blobs SET refs = refs + 1 WHERE hash = ?', (digest,)
+        ).rowcount
+        if not updated:
+            dictionary_id, data = self.compress(content)
+            self.connection.execute(
+                'INSERT INTO blobs VALUES (?, ?, ?, ?, 1, ?)',
+                (digest, dictionary_id, len(content), len(data), data)
+            )
+            self.size += len(data)
+            if not self.dictionaries:
+                self.train()
+        return digest
+
+    def release_blob(self, digest):
+        self.connection.execute(
+            'UPDATE blobs SET refs = refs - 1 WHERE hash = ?', (digest,)
+        )
+        row = self.connection.execute(
+            'SELECT size FROM blobs WHERE hash = ? AND refs <= 0', (digest,)
+        ).fetchone()
+        if row is not None:
+            self.connection.execute(
+                'DELETE FROM blobs WHERE hash = ?', (digest,)
+            )
+            self.size -= row[0]
+
+    def delete(self, key):
+        row = self.connection.execute(
+            'SELECT hash, LENGTH(meta) FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return False
+        self.connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+        self.accessed.pop(key, None)
+        self.size -= row[1]
+        self.release_blob(row[0])
+        return True
+
+    def flush_access(self):
+        self.connection.executemany(
+            'UPDATE responses SET accessed = ? WHERE key = ?',
+            ((accessed, key) for key, accessed in self.accessed.items())
+        )
+        self.accessed.clear()
+
+    def evict(self, max_size, keep=None):
+        """Удаляет давно не читавшиеся ответы, пока размер хранилища
+        больше max_size байт. Возвращает число удалённых ответов
+        и освобождённые байты.
+        """
+        size = self.size
+        removed = 0
+        with self.lock, self.connection:
+            self.flush_access()
+            keys = self.connection.execute(
+                'SELECT key FROM responses ORDER BY accessed'
+            ).fetchall()
+            for (key,) in keys:
+                if self.size <= max_size:
+                    break
+                if key != keep:
+                    removed += self.delete(key)
+        return removed, size - self.size
+
+    def vacuum(self):
+        """Возвращает системе место, освобождённое удалёнными ответами."""
+        with self.lock:
+            self.connection.execute('VACUUM')
+
+    def __getitem__(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT r.meta, b.dictionary, b.data FROM responses r '
+                'JOIN blobs b ON b.hash = r.hash WHERE r.key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+            self.accessed[key] = time.time()
+            if len(self.accessed) >= PAGE_STORE_ACCESS_BATCH:
+                with self.connection:
+                    self.flush_access()
+            meta, dictionary_id, data = row
+            content = self.decompress(dictionary_id, data)
+        response = self.deserialize(key, meta)
+        if response is None:
+            raise KeyError(key)
+        response._content = content
+        response.raw = CachedHTTPResponse.from_cached_response(response)
+        return response
+
+    def __setitem__(self, key, response):
+        meta = self.serialize(_without_content(response))
+        with self.lock, self.connection:
+            self.flush_access()
+            self.delete(key)
+            digest = self.acquire_blob(response.content or b'')
+            self.connection.execute(
+                'INSERT INTO responses VALUES (?, ?, ?, ?)',
+                (key, digest, meta, time.time())
+            )
+            self.size += len(meta)
+        if self.max_size is not None and self.size > self.max_size:
+            self.evict(self.max_size, keep=key)
+
+    def __delitem__(self, key):
+        with self.lock, self.connection:
+            if not self.delete(key):
+                raise KeyError(key)
+
+    def __iter__(self):
+        with self.lock:
+            keys = self.connection.execute(
+                'SELECT key FROM responses'
+            ).fetchall()
+        return (key for (key,) in keys)
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM responses'
+            ).fetchone()[0]
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM responses')
+            self.connection.execute('DELETE FROM blobs')
+            self.accessed.clear()
+            self.size = sum(map(len, self.dictionaries.values()))
+
+    def stats(self):
+        """Число ответов и уникальных тел, размер тел без сжатия
+        с учётом повторов и размер хранилища, байт.
+        """
+        with self.lock:
+            pages, bodies, raw_size = self.connection.execute(
+                'SELECT (SELECT COUNT(*) FROM responses), COUNT(*), '
+                'COALESCE(SUM(raw_size * refs), 0) FROM blobs'
+            ).fetchone()
+        return {
+            'pages': pages,
+            'bodies': bodies,
+            'raw_bytes': raw_size,
+            'stored_bytes': self.size,
+            'file_bytes': self.path.stat().st_size,
+            'dictionary': bool(self.dictionaries),
+        }
+
+    def close(self):
+        with self.lock, self.connection:
+            self.flush_access()
+        self.connection.close()
+
+
+def _without_content(response):
+    """Копия ответа без тела: тело хранится в таблице blobs."""
+    meta = response.__class__.from_response(response)
+    meta._content = None
+    meta._decoded_content = None
+    return meta
+
+
+class PageStoreCache(BaseCache):
+    """Кеш requests_cache поверх PageStore. Перенаправления хранятся
+    в той же базе SQLite.
+    """
+
+    def __init__(self, cache_name, max_size=None, **kwargs):
+        path = page_store_path(cache_name)
+        super().__init__(cache_name=str(path), **kwargs)
+        self.responses = PageStore(path, max_size)
+        self.redirects = SQLiteDict(
+            path, table_name='redirects', serializer=None
+        )
@@ -0,0 +1,78 @@
+import datetime as dt
+import sqlite3
+
+from constants import PEP_CREATED_FORMAT
+
+CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS peps (
+    number INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT,
+    type TEXT,
+    authors TEXT,
+    created TEXT
+)
+'''
+CREATE_INDEX = (
+    'CREATE INDEX IF NOT EXISTS peps_status_type ON peps (status, type)'
+)
+INSERT_PEP = 'INSERT OR REPLACE INTO peps VALUES (?, ?, ?, ?, ?, ?, ?)'
+SELECT_PEPS = (
+    'SELECT number, category, status, type, authors, created, url FROM peps'
+)
+
+
+def created_to_iso(created):
+    """Переводит дату из карточки PEP (13-Jun-2000) в формат ISO,
+    чтобы даты можно было сравнивать в запросах.
+    """
+    try:
+        return dt.datetime.strptime(created, PEP_CREATED_FORMAT).date(
+        ).isoformat()
+    except ValueError:
+        return created
+
+
+class PepIndex:
+    """Локальный индекс метаданных PEP в базе SQLite."""
+
+    def __init__(self, path):
+        path.parent.mkdir(exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(CREATE_TABLE)
+            self.connection.execute(CREATE_INDEX)
+
+    def update(self, records):
+        """Сохраняет записи (номер, категория, url, статус, тип,
+        авторы, дата создания).
+        """
+        with self.connection:
+            self.connection.executemany(
+                INSERT_PEP,
+                (
+                    (*record[:-1], created_to_iso(record[-1]))
+                    for record in records
+                )
+            )
+
+    def query(self, status=None, pep_type=None, author=None):
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+        if pep_type is not None:
+            conditions.append('type = ?')
+            params.append(pep_type)
+        if author is not None:
+            conditions.append('authors LIKE ?')
+            params.append(f'%{author}%')
+        sql = SELECT_PEPS
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        return self.connection.execute(sql + ' ORDER BY number', params)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,128 @@
+import datetime as dt
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ResultStore:
+    """Последние результаты режимов парсера. Результат хранится уже
+    сериализованным в JSON, поэтому запрос к API его только отправляет.
+    """
+
+    def __init__(self, modes):
+        self.modes = tuple(modes)
+        self.lock = threading.Lock()
+        self.bodies = {}
+        self.updated = {}
+
+    def update(self, mode, results):
+        header, *rows = results
+        updated = dt.datetime.now().isoformat(timespec='seconds')
+        body = json.dumps(
+            {'mode': mode, 'updated': updated, 'columns': header,
+             'rows': rows},
+            ensure_ascii=False
+        ).encode()
+        with self.lock:
+            self.bodies[mode] = body
+            self.updated[mode] = updated
+
+    def get(self, mode):
+        with self.lock:
+            return self.bodies.get(mode)
+
+    def index(self):
+        with self.lock:
+            updated = dict(self.updated)
+        return json.dumps(
+            {mode: updated.get(mode) for mode in self.modes}
+        ).encode()
+
+
+class ResultHandler(BaseHTTPRequestHandler):
+    """GET / — время обновления каждого режима,
+    GET /<режим> — последние результаты режима.
+    """
+
+    def do_GET(self):
+        store = self.server.store
+        mode = self.path.strip('/')
+        if not mode:
+            self.send_json(HTTPStatus.OK, store.index())
+        elif mode not in store.modes:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f'Нет режима {mode}')
+        else:
+            body = store.get(mode)
+            if body is None:
+                self.send_error_json(
+                    HTTPStatus.SERVICE_UNAVAILABLE,
+                    f'Результаты режима {mode} ещё не получены'
+                )
+            else:
+                self.send_json(HTTPStatus.OK, body)
+
+    def send_json(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json(
+            status, json.dumps({'error': message}, ensure_ascii=False).encode()
+        )
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+class ResultServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store):
+        super().__init__(address, ResultHandler)
+        self.store = store
+
+
+def refresh_loop(store, refresh, mode, interval, stopped):
+    """Обновляет результаты режима каждые interval секунд."""
+    while True:
+        try:
+            store.update(mode, refresh(mode))
+            logging.info(f'Результаты режима {mode} обновлены')
+        except Exception as e:
+            logging.exception(
+                f'Ошибка обновления режима {mode}: вызвано исключение '
+                f'{e.__class__.__name__}'
+            )
+        if stopped.wait(interval):
+            return
+
+
+def serve_results(refresh, intervals, host, port):
+    """Запускает обновление режимов по расписанию intervals
+    ({режим: период, секунд}) и HTTP API с их результатами.
+    refresh(mode) возвращает строки результата режима с заголовком.
+    Работает до прерывания с клавиатуры.
+    """
+    store = ResultStore(intervals)
+    stopped = threading.Event()
+    for mode, interval in intervals.items():
+        threading.Thread(
+            target=refresh_loop,
+            args=(store, refresh, mode, interval, stopped),
+            name=f'refresh-{mode}',
+            daemon=True
+        ).start()
+    server = ResultServer((host, port), store)
+    logging.info(f'Служба запущена: http://{host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
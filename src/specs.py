@@ -0,0 +1,122 @@
+import logging
+from urllib.parse import urljoin
+
+from analysis import PepTable
+from constants import (EXPECTED_STATUS, MAIN_DOC_URL, MAIN_PEPS_URL,
+                       PEP_INDEX_FILE, PEP_STATE_FILE,
+                       VERSION_STATUS_PATTERN)
+from engine import ModeSpec, same_item
+from extractors import (PepIndexEntry, extract_pep_card,
+                        extract_pep_index, extract_version_links,
+                        extract_whats_new, extract_whats_new_links)
+from metrics import metrics
+from pep_index import PepIndex
+from utils import add_msgs_to_logs
+
+
+def pep_entries(html):
+    return list(extract_pep_index(html).values())
+
+
+def dump_pep_entry(entry):
+    return entry.number, entry.category, entry.url
+
+
+def load_pep_entry(values):
+    return PepIndexEntry(*values)
+
+
+def pep_row(entry, url, card):
+    return (entry.number, entry.category, url, *card)
+
+
+def version_row(item):
+    link, text = item
+    pat = VERSION_STATUS_PATTERN.search(text)
+    if pat:
+        version = pat.group('version')
+        status = pat.group('status')
+    else:
+        version = text
+        status = ''
+    return link, version, status
+
+
+def whats_new_row(item, url, page):
+    h1_text, dl_text = page
+    return url, h1_text, dl_text
+
+
+def entry_url(entry):
+    return entry.url
+
+
+def log_status_mismatches(pep_table):
+    mismatches = pep_table.mismatches()
+    if not mismatches:
+        return
+    metrics.increment('status_mismatches', len(mismatches))
+    add_msgs_to_logs(
+        (
+            f'Несовпадающие статусы:\n{url}\n'
+            f'Статус в карточке: {status_pep}\n'
+            f'Ожидаемые статусы: {expected}'
+            for url, status_pep, expected in mismatches
+        ),
+        logging.info
+    )
+    summary = ', '.join(
+        f'{category}/{status_pep}: {count}'
+        for (category, status_pep), count in pep_table.crosstab().items()
+        if status_pep not in EXPECTED_STATUS[category[1:]]
+    )
+    logging.info(f'Несовпадения по категориям: {summary}')
+
+
+def summarize_peps(rows):
+    """Собирает карточки PEP в таблицу, сохраняет их в локальный индекс
+    и отдаёт количество PEP в каждом статусе.
+    """
+    pep_table = PepTable()
+    for row in rows:
+        pep_table.append(*row)
+    pep_index = PepIndex(PEP_INDEX_FILE)
+    pep_index.update(pep_table.rows())
+    pep_index.close()
+    log_status_mismatches(pep_table)
+    yield from pep_table.status_counts()
+    yield 'Total', len(pep_table)
+
+
+WHATS_NEW_SPEC = ModeSpec(
+    url=urljoin(MAIN_DOC_URL, 'whatsnew/'),
+    links=extract_whats_new_links,
+    header=('Ссылка на статью', 'Заголовок', 'Редактор, автор'),
+    follow=same_item,
+    page=extract_whats_new,
+    row=whats_new_row,
+)
+LATEST_VERSIONS_SPEC = ModeSpec(
+    url=MAIN_DOC_URL,
+    links=extract_version_links,
+    header=('Ссылка на документацию', 'Версия', 'Статус'),
+    row=version_row,
+)
+PEP_SPEC = ModeSpec(
+    url=MAIN_PEPS_URL,
+    links=pep_entries,
+    header=('Статус', 'Количество'),
+    follow=entry_url,
+    page=extract_pep_card,
+    row=pep_row,
+    summarize=summarize_peps,
+    state_file=PEP_STATE_FILE,
+    dump_item=dump_pep_entry,
+    load_item=load_pep_entry,
+)
+
+MODE_SPECS = {
+    'whats-new': WHATS_NEW_SPEC,
+    'latest-versions': LATEST_VERSIONS_SPEC,
+    'pep': PEP_SPEC,
+}
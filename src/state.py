@@ -0,0 +1,38 @@
+import json
+from hashlib import sha256
+
+
+class PageState:
+    """Состояние страниц с прошлого запуска парсера.
+
+    Для каждого URL хранится хеш содержимого страницы и значение,
+    извлечённое из неё. Неизменившиеся страницы повторно не разбираются.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.changed = set()
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                self.pages = json.load(f)
+
+    def get(self, url, content):
+        """Возвращает сохранённое значение, если содержимое страницы
+        не изменилось с прошлого запуска, иначе None.
+        """
+        saved = self.pages.get(url)
+        if saved is not None and saved['hash'] == sha256(content).hexdigest():
+            return saved['value']
+        return None
+
+    def set(self, url, content, value):
+        self.pages[url] = {'hash': sha256(content).hexdigest(), 'value': value}
+        self.changed.add(url)
+
+    def save(self):
+        self.path.parent.mkdir(exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.pages, f, ensure_ascii=False)
+        tmp_path.replace(self.path)
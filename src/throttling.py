@@ -0,0 +1,149 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests import ConnectionError, Timeout
+from requests.adapters import HTTPAdapter
+
+from constants import (BACKOFF_FACTOR, DECREASE_FACTOR, MAX_BACKOFF,
+                       MAX_RETRIES, RETRY_STATUSES, TARGET_LATENCY)
+from metrics import metrics
+
+
+class TokenBucket:
+    """Ограничивает частоту запросов: не больше rate в секунду
+    с допустимым всплеском до capacity запросов.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    """Ограничение числа одновременных запросов к хосту по схеме AIMD.
+
+    После быстрого успешного ответа предел растёт на 1 / предел,
+    после ответа 429/5xx, ошибки соединения или медленного ответа
+    предел умножается на DECREASE_FACTOR.
+    """
+
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency, overloaded):
+        with self.condition:
+            self.in_flight -= 1
+            if overloaded or latency > TARGET_LATENCY:
+                self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+            else:
+                self.limit = min(
+                    self.max_limit, self.limit + 1 / self.limit
+                )
+            self.condition.notify_all()
+
+
+def retry_delay(response, attempt):
+    """Пауза перед повтором: значение Retry-After из ответа или
+    экспоненциальная задержка BACKOFF_FACTOR * 2 ** attempt.
+    """
+    retry_after = None if response is None else (
+        response.headers.get('Retry-After')
+    )
+    if retry_after:
+        if retry_after.isdigit():
+            return min(int(retry_after), MAX_BACKOFF)
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            pass
+        else:
+            return min(max(retry_at.timestamp() - time.time(), 0), MAX_BACKOFF)
+    return min(BACKOFF_FACTOR * 2 ** attempt, MAX_BACKOFF)
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """HTTP-адаптер с ограничением частоты и числа одновременных
+    запросов к каждому хосту и повтором запросов после 429/5xx.
+
+    Адаптер стоит под кеширующей сессией, поэтому ответы из кеша
+    ограничения не расходуют.
+    """
+
+    def __init__(self, rate=None, max_concurrency=1, **kwargs):
+        super().__init__(**kwargs)
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.hosts = {}
+        self.hosts_lock = threading.Lock()
+
+    def host_limits(self, url):
+        host = urlsplit(url).netloc
+        with self.hosts_lock:
+            if host not in self.hosts:
+                bucket = TokenBucket(self.rate) if self.rate else None
+                self.hosts[host] = (
+                    bucket, AdaptiveLimiter(self.max_concurrency)
+                )
+            return self.hosts[host]
+
+    def send_once(self, request, limiter, **kwargs):
+        """Отправляет запрос и сообщает ограничителю результат."""
+        limiter.acquire()
+        started = time.monotonic()
+        overloaded = True
+        try:
+            response = super().send(request, **kwargs)
+            overloaded = response.status_code in RETRY_STATUSES
+            return response
+        finally:
+            limiter.release(time.monotonic() - started, overloaded)
+
+    def send(self, request, **kwargs):
+        bucket, limiter = self.host_limits(request.url)
+        for attempt in range(MAX_RETRIES + 1):
+            if bucket is not None:
+                bucket.acquire()
+            response = None
+            try:
+                response = self.send_once(request, limiter, **kwargs)
+            except (ConnectionError, Timeout):
+                if attempt == MAX_RETRIES:
+                    raise
+            if response is not None and (
+                response.status_code not in RETRY_STATUSES
+                or attempt == MAX_RETRIES
+            ):
+                return response
+            metrics.increment('retries')
+            time.sleep(retry_delay(response, attempt))
+            if response is not None:
+                response.close()
@@ -1,27 +1,51 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 
 from bs4 import BeautifulSoup
-from requests import RequestException
+from requests import RequestException, Session
+from tqdm import tqdm
 
+from constants import (DEFAULT_WORKERS, DOWNLOAD_CHUNK_SIZE, ETAG_SUFFIX,
+                       FIND_TAG_EXCERPT_LENGTH)
 from exceptions import ParserFindTagException, ResponseIsNoneException
+from metrics import metrics
 
 
 def get_response(session, url, encoding='utf-8'):
+    started = time.perf_counter()
     try:
         response = session.get(url)
     except RequestException as e:
+        metrics.increment('fetch_errors')
         raise ResponseIsNoneException(
             f'Страница PEP {url} не загрузилась. '
             f'Вызвано исключение {e.__class__.__name__}. '
             'Переход к следующему PEP.')
+    metrics.record_response(url, response, time.perf_counter() - started)
     response.encoding = encoding
     return response
 
 
+def soup_excerpt(soup, length=FIND_TAG_EXCERPT_LENGTH):
+    """Начало текста дерева не длиннее length символов. Строки дерева
+    перебираются только до нужной длины, дерево целиком не сериализуется.
+    """
+    parts = []
+    size = 0
+    for string in soup.stripped_strings:
+        parts.append(string)
+        size += len(string) + 1
+        if size > length:
+            return ' '.join(parts)[:length] + '...'
+    return ' '.join(parts)
+
+
 def find_tag(soup, tag, attrs=None):
     searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
-        error_msg = f'Не найден тег {tag} {attrs}, {soup}'
+        error_msg = f'Не найден тег {tag} {attrs}, {soup_excerpt(soup)}'
         logging.error(error_msg, stack_info=True)
         raise ParserFindTagException(error_msg)
     return searched_tag
@@ -32,6 +56,95 @@ def create_bsoup_from_url(session, url_constant, encoding='utf-8'):
     return BeautifulSoup(response.text, features='lxml')
 
 
+def map_urls(func, urls, workers=DEFAULT_WORKERS):
+    """Вызывает func(url) для каждого url в пуле из workers потоков.
+    Возвращает пары (url, результат) в порядке следования urls.
+    Если страница не загрузилась, вместо результата возвращается
+    исключение RequestException.
+    """
+    def load(url):
+        try:
+            return url, func(url)
+        except RequestException as e:
+            return url, e
+
+    if workers == 1:
+        yield from map(load, urls)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(load, urls)
+
+
+def uncached_session(session, url):
+    """Сессия без кеша с тем же адаптером для url, что и у session:
+    с общим пулом соединений и ограничением частоты запросов.
+    session.cache_disabled() выключает кеш всей сессии и мешает
+    режимам, которые в это время работают в других потоках.
+    Сессию нельзя закрывать: закроется и общий адаптер.
+    """
+    plain_session = Session()
+    plain_session.mount(url, session.get_adapter(url))
+    return plain_session
+
+
+def save_etag(etag_path, etag):
+    """Сохраняет ETag файла или удаляет устаревший, если сервер
+    ETag не вернул.
+    """
+    if etag is not None:
+        etag_path.write_text(etag)
+    elif etag_path.exists():
+        etag_path.unlink()
+
+
+def download_file(session, url, file_path):
+    """Потоково загружает файл частями по DOWNLOAD_CHUNK_SIZE байт.
+    Недокачанный файл дозагружается запросом Range, если ETag на сервере
+    не изменился. Возвращает False, если локальный файл уже актуален.
+    """
+    etag_path = file_path.with_name(file_path.name + ETAG_SUFFIX)
+    downloaded = file_path.stat().st_size if file_path.exists() else 0
+    headers = {}
+    if downloaded and etag_path.exists():
+        headers['Range'] = f'bytes={downloaded}-'
+        headers['If-Range'] = etag_path.read_text()
+    try:
+        response = uncached_session(session, url).get(
+            url, headers=headers, stream=True
+        )
+    except RequestException as e:
+        raise ResponseIsNoneException(
+            f'Файл {url} не загрузился. '
+            f'Вызвано исключение {e.__class__.__name__}.')
+    with response:
+        if response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            content_range = response.headers.get('Content-Range', '')
+            if content_range.endswith(f'/{downloaded}'):
+                return False
+            file_path.unlink()
+            etag_path.unlink()
+            return download_file(session, url, file_path)
+        if response.status_code not in (
+            HTTPStatus.OK, HTTPStatus.PARTIAL_CONTENT
+        ):
+            raise ResponseIsNoneException(
+                f'Файл {url} не загрузился. '
+                f'Код ответа {response.status_code}.')
+        if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+            downloaded = 0
+            save_etag(etag_path, response.headers.get('ETag'))
+        content_length = response.headers.get('Content-Length')
+        total = downloaded + int(content_length) if content_length else None
+        with open(file_path, 'ab' if downloaded else 'wb') as file, tqdm(
+            total=total, initial=downloaded, unit='B', unit_scale=True,
+            unit_divisor=1024, desc=file_path.name
+        ) as progress:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+                progress.update(len(chunk))
+    return True
+
+
 def add_msgs_to_logs(msg_list, log_method):
     for msg in msg_list:
         log_method(msg)
@@ -0,0 +1,128 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+
+from constants import QUEUE_BUSY_TIMEOUT, QUEUE_LEASE
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    items TEXT NOT NULL,
+    worker TEXT,
+    taken REAL,
+    rows TEXT
+);
+CREATE INDEX IF NOT EXISTS shards_mode ON shards (mode);
+'''
+CLAIM_SHARD = '''
+SELECT id, mode, items FROM shards
+WHERE rows IS NULL AND (taken IS NULL OR taken < ?) {mode_filter}
+ORDER BY id LIMIT 1
+'''
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def split(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+class WorkQueue:
+    """Очередь шардов в базе SQLite, общей для процессов-обработчиков.
+
+    Шард — часть элементов стартовой страницы режима. Обработчик
+    забирает свободный шард, загружает его страницы и сохраняет строки
+    результата. Элементы и строки хранятся в JSON: файл очереди может
+    быть общим для нескольких машин, и чтение из него не должно
+    выполнять код. Шард, который обработчик не завершил за lease секунд,
+    снова выдаётся другим обработчикам.
+    """
+
+    def __init__(self, path, lease=QUEUE_LEASE):
+        self.path = path
+        self.lease = lease
+        self.worker = worker_name()
+        self.connection = sqlite3.connect(
+            path, timeout=QUEUE_BUSY_TIMEOUT, isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def enqueue(self, mode, items, shard_size):
+        """Заменяет шарды режима mode частями items по shard_size
+        элементов. Возвращает число шардов.
+        """
+        shards = split(items, shard_size)
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            self.connection.execute(
+                'DELETE FROM shards WHERE mode = ?', (mode,)
+            )
+            self.connection.executemany(
+                'INSERT INTO shards (mode, items) VALUES (?, ?)',
+                ((mode, json.dumps(shard)) for shard in shards)
+            )
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+        return len(shards)
+
+    def claim(self, modes=None):
+        """Забирает свободный шард одного из режимов modes (по умолчанию
+        любого) и возвращает (id, режим, элементы) или None.
+        """
+        mode_filter = ''
+        params = [time.time() - self.lease]
+        if modes is not None:
+            mode_filter = f'AND mode IN ({", ".join("?" * len(modes))})'
+            params.extend(modes)
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.connection.execute(
+                CLAIM_SHARD.format(mode_filter=mode_filter), params
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    'UPDATE shards SET worker = ?, taken = ? WHERE id = ?',
+                    (self.worker, time.time(), row[0])
+                )
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+        if row is None:
+            return None
+        shard_id, mode, items = row
+        return shard_id, mode, json.loads(items)
+
+    def complete(self, shard_id, rows):
+        """Сохраняет строки результата шарда. Если шард за это время
+        заменён новым запуском режима, строки отбрасываются.
+        """
+        self.connection.execute(
+            'UPDATE shards SET rows = ? WHERE id = ? AND rows IS NULL',
+            (json.dumps(rows, ensure_ascii=False), shard_id)
+        )
+
+    def pending(self, mode):
+        """Число незавершённых шардов режима."""
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM shards WHERE mode = ? AND rows IS NULL',
+            (mode,)
+        ).fetchone()[0]
+
+    def rows(self, mode):
+        """Строки результата всех шардов режима в порядке шардов."""
+        for (rows,) in self.connection.execute(
+            'SELECT rows FROM shards WHERE mode = ? ORDER BY id', (mode,)
+        ):
+            yield from map(tuple, json.loads(rows))
+
+    def close(self):
+        self.connection.close()
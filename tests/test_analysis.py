@@ -0,0 +1,38 @@
+try:
+    from src import analysis
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `analysis.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `analysis.py`'
+
+PEPS = [
+    (1, 'PA', 'https://peps.python.org/pep-0001/', 'Active'),
+    (8, 'PA', 'https://peps.python.org/pep-0008/', 'Active'),
+    (505, 'SD', 'https://peps.python.org/pep-0505/', 'Draft'),
+    (572, 'SF', 'https://peps.python.org/pep-0572/', 'Final'),
+]
+
+
+def build_table():
+    table = analysis.PepTable()
+    for number, category, url, status in PEPS:
+        table.append(number, category, url, status, '', '', '')
+    return table
+
+
+def test_pep_table_status_counts():
+    got = build_table().status_counts()
+    assert got == [('Active', 2), ('Draft', 1), ('Final', 1)], (
+        'Метод `PepTable.status_counts` должен вернуть количество PEP '
+        'в каждом статусе в порядке первого появления статуса'
+    )
+
+
+def test_pep_table_mismatches():
+    got = build_table().mismatches()
+    assert got == [
+        ('https://peps.python.org/pep-0505/', 'Draft', ('Deferred',))
+    ], (
+        'Метод `PepTable.mismatches` должен вернуть только PEP, статус '
+        'которых не совпадает с ожидаемым для категории'
+    )
@@ -0,0 +1,45 @@
+import requests
+try:
+    from src import archive
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `archive.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `archive.py`'
+
+URL = 'https://peps.python.org/pep-0008/'
+MISSING_URL = 'https://peps.python.org/pep-0020/'
+
+
+def test_archive_replays_recorded_pages(tmp_path):
+    path = tmp_path / 'pages.bin'
+    writer = archive.ArchiveWriter(path)
+    writer.add(URL, 200, {'Content-Type': 'text/html'}, b'<dl></dl>')
+    writer.close()
+
+    reader = archive.ArchiveReader(path)
+    assert reader.get(URL) == (200, {'Content-Type': 'text/html'},
+                               b'<dl></dl>'), (
+        '`ArchiveReader.get` должен вернуть статус, заголовки и тело '
+        'записанной страницы'
+    )
+    assert reader.get(MISSING_URL) is None, (
+        'Для страницы, которой нет в архиве, `ArchiveReader.get` '
+        'должен вернуть `None`'
+    )
+    reader.close()
+
+    session = requests.Session()
+    session.mount('https://', archive.ArchiveAdapter(path))
+    response = session.get(URL)
+    assert response.content == b'<dl></dl>', (
+        'Сессия с `ArchiveAdapter` должна отдавать страницу из архива'
+    )
+    try:
+        session.get(MISSING_URL)
+    except requests.ConnectionError:
+        pass
+    else:
+        assert False, (
+            'Для страницы, которой нет в архиве, должно '
+            'выбрасываться `ConnectionError`'
+        )
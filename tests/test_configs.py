@@ -1,11 +1,15 @@
 import pytest
 import argparse
+import requests_mock
 try:
     from src import configs
 except ModuleNotFoundError:
     assert False, 'Убедитесь что в директории `src` есть файл `configs.py`'
 except ImportError:
     assert False, 'Убедитесь что в директории `src` есть файл `configs.py`'
+from src.constants import METRICS_FORMAT_TO_EXTENSION, URLS_EXPIRE_AFTER
+
+PAGE_URL = 'https://example.com/page/'
 
 
 def test_configs_file():
@@ -29,9 +33,142 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'feather', 'parquet'),
         'Дополнительные способы вывода данных'
     ),
+    (
+        argparse._StoreAction, ['-w', '--workers'], 'workers',
+        None,
+        'Количество потоков для параллельной загрузки страниц'
+    ),
+    (
+        argparse._StoreAction, ['--parse-workers'], 'parse_workers',
+        None,
+        (
+            'Количество процессов для разбора HTML (по умолчанию страницы '
+            'разбираются в потоках загрузки)'
+        )
+    ),
+    (
+        argparse._StoreAction, ['--max-connections'], 'max_connections',
+        None,
+        (
+            'Максимум keep-alive соединений с одним хостом (по умолчанию '
+            'равен числу потоков)'
+        )
+    ),
+    (
+        argparse._StoreAction, ['--max-rss'], 'max_rss',
+        None,
+        (
+            'Бюджет памяти процесса в мегабайтах: новые страницы не '
+            'загружаются, пока он превышен'
+        )
+    ),
+    (
+        argparse._StoreTrueAction, ['--trace-memory'], 'trace_memory',
+        None,
+        'Записать в лог пик памяти режимов (tracemalloc)'
+    ),
+    (
+        argparse._StoreAction, ['--rate'], 'rate',
+        None,
+        'Максимум запросов в секунду к одному хосту'
+    ),
+    (
+        argparse._StoreAction, ['--cache-backend'], 'cache_backend',
+        ('sqlite', 'filesystem', 'memory', 'pagestore'),
+        'Хранилище кеша HTTP-ответов'
+    ),
+    (
+        argparse._StoreAction, ['--cache-name'], 'cache_name',
+        None,
+        'Путь к кешу: файл базы sqlite или директория filesystem'
+    ),
+    (
+        argparse._StoreAction, ['--max-cache-size'], 'max_cache_size',
+        None,
+        (
+            'Максимальный размер кеша pagestore в мегабайтах, для команды '
+            'cache-prune'
+        )
+    ),
+    (
+        argparse._StoreAction, ['--expire-after'], 'expire_after',
+        None,
+        (
+            'Срок жизни кеша в секундах для URL, не попавших в шаблоны '
+            'URLS_EXPIRE_AFTER'
+        )
+    ),
+    (
+        argparse._StoreTrueAction, ['--revalidate'], 'revalidate',
+        None,
+        'Проверять каждую страницу кеша условным запросом'
+    ),
+    (
+        argparse._StoreAction, ['--record'], 'record',
+        None,
+        'Записать загруженные страницы в архив для запуска без сети'
+    ),
+    (
+        argparse._StoreAction, ['--from-archive'], 'from_archive',
+        None,
+        'Брать страницы из архива, записанного с флагом --record'
+    ),
+    (
+        argparse._StoreTrueAction, ['-i', '--incremental'], 'incremental',
+        None,
+        'Разбирать только страницы, изменившиеся с прошлого запуска'
+    ),
+    (
+        argparse._StoreAction, ['--queue'], 'queue',
+        None,
+        (
+            'Файл очереди SQLite: страницы режимов pep и whats-new '
+            'делятся на шарды для команды worker'
+        )
+    ),
+    (
+        argparse._StoreAction, ['--shard-size'], 'shard_size',
+        None,
+        'Количество страниц в одном шарде очереди'
+    ),
+    (
+        argparse._StoreAction, ['--idle-timeout'], 'idle_timeout',
+        None,
+        'Сколько секунд команда worker ждёт новые шарды'
+    ),
+    (
+        argparse._StoreAction, ['--status'], 'status',
+        None,
+        'Фильтр pep-query: статус PEP'
+    ),
+    (
+        argparse._StoreAction, ['--type'], 'type',
+        None,
+        'Фильтр pep-query: тип PEP'
+    ),
+    (
+        argparse._StoreAction, ['--author'], 'author',
+        None,
+        'Фильтр pep-query: часть имени автора'
+    ),
+    (
+        argparse._StoreAction, ['--host'], 'host',
+        None,
+        'Адрес HTTP API команды serve'
+    ),
+    (
+        argparse._StoreAction, ['--port'], 'port',
+        None,
+        'Порт HTTP API команды serve'
+    ),
+    (
+        argparse._StoreAction, ['-m', '--metrics'], 'metrics',
+        METRICS_FORMAT_TO_EXTENSION.keys(),
+        'Сохранить метрики работы парсера в файл'
+    ),
 ])
 def test_configure_argument_parser(
         action,
@@ -64,3 +201,78 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def session_args(tmp_path, *options):
+    parser = configs.configure_argument_parser(['pep'])
+    return parser.parse_args(
+        ['pep', '--cache-name', str(tmp_path / 'http_cache'), *options]
+    )
+
+
+@pytest.mark.parametrize('backend, cache_class', [
+    ('sqlite', 'SQLiteCache'),
+    ('memory', 'BaseCache'),
+    ('pagestore', 'PageStoreCache'),
+])
+def test_configure_session_backend(tmp_path, backend, cache_class):
+    session = configs.configure_session(session_args(
+        tmp_path, '--cache-backend', backend, '--revalidate'
+    ))
+    assert type(session.cache).__name__ == cache_class, (
+        f'Для --cache-backend {backend} сессия должна использовать '
+        f'кеш {cache_class}'
+    )
+    assert session.settings.urls_expire_after == URLS_EXPIRE_AFTER, (
+        'Сессия должна задавать срок жизни кеша по шаблонам '
+        '`URLS_EXPIRE_AFTER`'
+    )
+    assert session.settings.always_revalidate is True
+    session.close()
+
+
+@pytest.mark.parametrize('options, pool_size', [
+    (('-w', '4'), 4),
+    (('-w', '4', '--max-connections', '2'), 2),
+])
+def test_configure_session_pool_size(tmp_path, options, pool_size):
+    session = configs.configure_session(
+        session_args(tmp_path, '--cache-backend', 'memory', *options)
+    )
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert adapter._pool_maxsize == pool_size, (
+        'Размер пула соединений должен быть равен --max-connections '
+        'или, если он не задан, числу потоков --workers'
+    )
+
+
+def test_configure_session_revalidates_expired_page(tmp_path):
+    session = configs.configure_session(session_args(
+        tmp_path, '--cache-backend', 'memory', '--expire-after', '0'
+    ))
+    adapter = requests_mock.Adapter()
+
+    def page(request, context):
+        context.headers['ETag'] = '"v1"'
+        if request.headers.get('If-None-Match') == '"v1"':
+            context.status_code = 304
+            return ''
+        return 'page'
+
+    adapter.register_uri('GET', PAGE_URL, text=page)
+    session.mount(PAGE_URL, adapter)
+    session.get(PAGE_URL)
+    got = session.get(PAGE_URL)
+    assert adapter.last_request.headers.get('If-None-Match') == '"v1"', (
+        'Устаревшая страница кеша должна перезапрашиваться условным GET'
+    )
+    assert got.from_cache and got.text == 'page', (
+        'При ответе 304 страница должна браться из кеша'
+    )
+
+
+@pytest.mark.parametrize('rate', ['0', '-1', 'nan'])
+def test_rate_must_be_positive(rate):
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--rate', rate])
@@ -0,0 +1,37 @@
+import time
+
+import requests
+import requests_mock
+try:
+    from src import crawler
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `crawler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `crawler.py`'
+
+PAGE_URL = 'https://example.com/page-{}/'
+
+
+def test_crawl_parse_workers_order_and_errors():
+    urls = [PAGE_URL.format(i) for i in range(8)]
+    session = requests.Session()
+    with requests_mock.Mocker(session=session) as mock:
+        for i, url in enumerate(urls):
+            mock.get(url, text=lambda request, context, i=i: (
+                time.sleep((8 - i) / 1000) or f'page {i}'
+            ))
+        mock.get(urls[3], exc=requests.exceptions.ConnectTimeout)
+        got = list(crawler.crawl(
+            session, urls, str.upper, workers=4, parse_workers=2
+        ))
+    assert [url for url, _ in got] == urls, (
+        'Функция `crawl` с parse_workers должна возвращать результаты '
+        'в порядке urls'
+    )
+    assert isinstance(got[3][1], requests.RequestException), (
+        'Функция `crawl` должна возвращать исключение незагрузившейся '
+        'страницы на её месте'
+    )
+    assert [page for _, page in got[:3] + got[4:]] == [
+        f'PAGE {i}' for i in (0, 1, 2, 4, 5, 6, 7)
+    ], 'Функция `crawl` должна разобрать страницы в пуле процессов'
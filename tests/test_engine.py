@@ -0,0 +1,130 @@
+import threading
+import time
+from argparse import Namespace
+
+import requests
+import requests_mock
+try:
+    from src import engine
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `engine.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `engine.py`'
+try:
+    from src import work_queue
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `work_queue.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `work_queue.py`'
+
+INDEX_URL = 'https://example.com/docs/'
+
+
+def links(html):
+    return html.split()
+
+
+def title(html):
+    return html.upper()
+
+
+def test_run_spec_follows_links():
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', INDEX_URL, text='a.html b.html')
+    adapter.register_uri('GET', INDEX_URL + 'a.html', text='first')
+    adapter.register_uri('GET', INDEX_URL + 'b.html', text='second')
+    session = requests.Session()
+    session.mount('https://', adapter)
+    spec = engine.ModeSpec(
+        url=INDEX_URL,
+        links=links,
+        header=('Ссылка', 'Заголовок'),
+        follow=lambda href: href,
+        page=title,
+        row=lambda href, url, page: (url, page),
+    )
+    got = list(engine.run_spec(spec, session))
+    assert got == [
+        ('Ссылка', 'Заголовок'),
+        (INDEX_URL + 'a.html', 'FIRST'),
+        (INDEX_URL + 'b.html', 'SECOND'),
+    ], (
+        '`run_spec` должен отдать заголовок и строки по страницам, '
+        'загруженным по ссылкам со стартовой страницы'
+    )
+
+
+def test_run_spec_with_queue(tmp_path):
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', INDEX_URL, text='a.html b.html c.html')
+    for name in ('a', 'b', 'c'):
+        adapter.register_uri('GET', f'{INDEX_URL}{name}.html', text=name)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    spec = engine.ModeSpec(
+        url=INDEX_URL,
+        links=links,
+        header=('Заголовок',),
+        follow=lambda href: href,
+        page=title,
+        row=lambda href, url, page: (page,),
+    )
+    cli_args = Namespace(
+        mode='docs', queue=tmp_path / 'queue.sqlite3', shard_size=2,
+        workers=1, parse_workers=None, max_rss=None, incremental=False
+    )
+    got = list(engine.run_spec(spec, session, cli_args))
+    assert got == [('Заголовок',), ('A',), ('B',), ('C',)], (
+        'С флагом --queue `run_spec` должен собрать строки всех шардов '
+        'в порядке ссылок'
+    )
+
+
+def test_worker_started_before_enqueue(monkeypatch, tmp_path):
+    monkeypatch.setattr(engine, 'QUEUE_POLL_INTERVAL', 0.01)
+    names = [f'{i}.html' for i in range(6)]
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', INDEX_URL, text=' '.join(names))
+    for name in names:
+        adapter.register_uri(
+            'GET', INDEX_URL + name,
+            text=lambda request, context, name=name: (
+                time.sleep(0.05) or name
+            )
+        )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    spec = engine.ModeSpec(
+        url=INDEX_URL,
+        links=links,
+        header=('Заголовок',),
+        follow=lambda href: href,
+        page=title,
+        row=lambda href, url, page: (page,),
+    )
+    cli_args = Namespace(
+        mode='docs', queue=tmp_path / 'queue.sqlite3', shard_size=1,
+        workers=1, parse_workers=None, max_rss=None, incremental=False
+    )
+    processed = []
+
+    def worker():
+        queue = work_queue.WorkQueue(cli_args.queue)
+        processed.append(engine.process_shards(
+            queue, session, cli_args, {'docs': spec}, idle_timeout=1
+        ))
+        queue.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.1)
+    got = list(engine.run_spec(spec, session, cli_args))
+    thread.join(5)
+    assert got == [('Заголовок',), *((name.upper(),) for name in names)], (
+        'Строки шардов, обработанных командой worker, должны попасть '
+        'в результат в порядке ссылок'
+    )
+    assert processed and processed[0] > 0, (
+        'Обработчик, запущенный до заполнения очереди, должен дождаться '
+        'шардов и обработать их'
+    )
@@ -0,0 +1,80 @@
+import pytest
+try:
+    from src import extractors
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+
+PEP_PAGE = (
+    '<html><body><h1>PEP 8</h1><dl class="rfc2822 field-list simple">'
+    '<dt>Author:</dt><dd>Guido van Rossum</dd>'
+    '<dt>Status:</dt><dd><abbr title="Currently valid">Active</abbr></dd>'
+    '<dt>Type:</dt><dd><abbr title="Normative">Process</abbr></dd>'
+    '<dt>Created:</dt><dd>05-Jul-2001</dd>'
+    '</dl><dl><dt>other</dt><dd><abbr>Final</abbr></dd></dl></body></html>'
+)
+WHATS_NEW_PAGE = (
+    '<html><body><section><h1>What’s New In Python 3.12</h1>'
+    '<dl class="field-list"><dt>Editor:</dt>\n<dd>Adam Turner</dd></dl>'
+    '</section></body></html>'
+)
+
+PEP_INDEX_PAGE = (
+    '<html><body><section id="index-by-category"><table>'
+    '<tr><th>Status</th><th>PEP</th></tr>'
+    '<tr><td><abbr title="Meta, Active">PA</abbr></td>'
+    '<td><a class="pep reference internal" href="pep-0001/">1</a></td>'
+    '<td><a class="pep reference internal" href="pep-0001/">Guidelines</a>'
+    '</td></tr>'
+    '<tr><td><abbr title="Standards Track, Final">SF</abbr></td>'
+    '<td><a class="pep reference internal" href="pep-0008/">8</a></td>'
+    '</tr></table></section></body></html>'
+)
+
+
+def test_extract_pep_index():
+    got = extractors.extract_pep_index(PEP_INDEX_PAGE)
+    assert [
+        (number, entry.category, entry.url) for number, entry in got.items()
+    ] == [(1, 'PA', 'pep-0001/'), (8, 'SF', 'pep-0008/')], (
+        'Функция `extract_pep_index` должна вернуть записи с категорией '
+        'и ссылкой из каждой строки таблицы по номеру PEP'
+    )
+
+
+def test_extract_pep_card():
+    got = extractors.extract_pep_card(PEP_PAGE)
+    assert got == ('Active', 'Process', 'Guido van Rossum', '05-Jul-2001'), (
+        'Функция `extract_pep_card` должна вернуть статус, тип, авторов '
+        'и дату создания из первого тега `dl` страницы PEP'
+    )
+
+
+def test_extract_whats_new():
+    got = extractors.extract_whats_new(WHATS_NEW_PAGE)
+    assert got == ('What’s New In Python 3.12', 'Editor: Adam Turner'), (
+        'Функция `extract_whats_new` должна вернуть кортеж из текста '
+        'заголовка `h1` и текста первого тега `dl`'
+    )
+
+
+def test_extract_whats_new_exception():
+    with pytest.raises(BaseException) as excinfo:
+        extractors.extract_whats_new('<html><body></body></html>')
+    assert excinfo.typename == 'ParserFindTagException', (
+        'При отсутствии тега `h1` функция `extract_whats_new` должна '
+        'выбросить исключение `ParserFindTagException`'
+    )
+
+
+def test_extract_whats_new_takes_first_dl():
+    page = (
+        '<html><body><dl><dt>Editor:</dt><dd><dl><dt>inner</dt></dl></dd>'
+        '</dl><h1>What’s New</h1><dl><dt>other</dt></dl></body></html>'
+    )
+    got = extractors.extract_whats_new(page)
+    assert got == ('What’s New', 'Editor:inner'), (
+        'Функция `extract_whats_new` должна вернуть текст первого '
+        'по порядку тега `dl`, даже если он стоит до `h1`'
+    )
@@ -1,3 +1,4 @@
+import inspect
 import pytest
 from pathlib import Path
 try:
@@ -33,9 +34,10 @@ def test_main_file():
 def test_whats_new(mock_session):
     got = main.whats_new(mock_session)
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
-    assert isinstance(got, list), (
-        'Функция `whats_new` должна возвращать объект типа `list`'
+    assert inspect.isgenerator(got), (
+        'Функция `whats_new` должна быть генератором строк результата'
     )
+    got = list(got)
     assert len(got) > 0, (
         'Убедитесь что функция `whats_new` модуля `main.py` '
         'возвращает непустой список'
@@ -54,9 +56,10 @@ def test_whats_new(mock_session):
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
     got = main.latest_versions(mock_session)
-    assert isinstance(got, list), (
-        'Функция `latest_versions` должна возвращать объект типа `list`'
+    assert inspect.isgenerator(got), (
+        'Функция `latest_versions` должна быть генератором строк результата'
     )
+    got = list(got)
     assert isinstance(got[0], tuple), (
         'Функция `latest_versions` должна вернуть список `result`, '
         'элементами которого должны быть объекты типа `tuple`'
@@ -140,3 +143,11 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_select_modes():
+    got = main.select_modes(['all', 'pep'], None)
+    assert got == list(main.MODE_TO_FUNCTION), (
+        'Функция `select_modes` должна раскрывать `all` во все режимы '
+        'из `MODE_TO_FUNCTION` без повторов'
+    )
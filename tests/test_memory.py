@@ -0,0 +1,58 @@
+import threading
+
+try:
+    from src import memory
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memory.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memory.py`'
+
+
+def test_memory_budget_keeps_one_page_in_flight():
+    budget = memory.MemoryBudget(max_rss=1)
+    budget.acquire()
+    assert budget.in_flight == 1, (
+        'Даже при превышенном бюджете памяти `MemoryBudget` должен '
+        'пропускать страницу, если других страниц в обработке нет'
+    )
+    budget.release()
+    assert budget.in_flight == 0
+
+
+def test_memory_budget_resumes_below_threshold(monkeypatch):
+    rss = [150]
+    collections = []
+    monkeypatch.setattr(memory, 'current_rss', lambda: rss[0])
+    monkeypatch.setattr(memory.gc, 'collect', lambda: collections.append(1))
+    monkeypatch.setattr(memory, 'MEMORY_WAIT_TIMEOUT', 0.01)
+    budget = memory.MemoryBudget(max_rss=100)
+    budget.acquire()
+    waiting = threading.Thread(target=budget.acquire)
+    waiting.start()
+    waiting.join(0.05)
+    assert budget.throttled, (
+        '`MemoryBudget` должен отметить превышение бюджета памяти'
+    )
+    rss[0] = 95
+    waiting.join(0.05)
+    assert waiting.is_alive(), (
+        'После превышения бюджета `MemoryBudget` должен ждать, пока RSS '
+        'не опустится ниже порога возобновления'
+    )
+    rss[0] = 80
+    waiting.join(1)
+    assert not waiting.is_alive()
+    assert budget.in_flight == 2
+    assert len(collections) == 1, (
+        'Сборщик мусора должен запускаться один раз за превышение бюджета'
+    )
+
+
+def test_trace_memory_records_peak():
+    with memory.trace_memory('test-mode'):
+        data = [bytes(1024) for _ in range(100)]
+    del data
+    got = memory.metrics.details['test-mode']
+    assert got['peak_traced_mb'] > 0, (
+        '`trace_memory` должен сохранять в метрики пик памяти блока'
+    )
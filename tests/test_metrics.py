@@ -0,0 +1,27 @@
+import json
+try:
+    from src import metrics
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+def test_metrics_dump(tmp_path):
+    collector = metrics.Metrics()
+    with collector.timer('parse', 'https://peps.python.org/pep-0008/'):
+        pass
+    collector.increment('status_mismatches')
+    file_path = tmp_path / 'metrics' / 'pep.json'
+    collector.dump(file_path)
+    with open(file_path, encoding='utf-8') as f:
+        got = json.load(f)
+    assert 'parse' in got['timings'], (
+        'В файле метрик должно быть время этапа `parse`'
+    )
+    assert got['counters'] == {'status_mismatches': 1}, (
+        'В файле метрик должны быть счётчики событий'
+    )
+    assert 'https://peps.python.org/pep-0008/' in got['details'], (
+        'В файле метрик должно быть время этапов по каждому URL'
+    )
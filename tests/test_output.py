@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -80,6 +81,62 @@ def test_control_output_file(monkeypatch, tmp_path, records, cli_arg):
     )
 
 
+@pytest.mark.parametrize('cli_arg', [
+    cli_args('whats-new', 'jsonl'),
+    cli_args('pep', 'jsonl'),
+])
+def test_control_output_jsonl(monkeypatch, tmp_path, records, cli_arg):
+    mock_base_dir = Path(tmp_path)
+    monkeypatch.setattr(outputs, 'BASE_DIR', mock_base_dir)
+
+    records = records(cli_arg.mode)
+    outputs.control_output(records, cli_arg)
+    output_files = list(mock_base_dir.glob('results/*.jsonl'))
+    assert len(output_files) == 1, (
+        'Убедитесь что при выводе в формате jsonl в директории `results` '
+        'создается файл с расширением `.jsonl`'
+    )
+    with open(output_files[0], encoding='utf-8') as f:
+        got = [json.loads(line) for line in f]
+    assert got[0] == dict(zip(records[0], records[1])), (
+        'Каждая строка файла jsonl должна быть объектом с ключами '
+        'из строки заголовка'
+    )
+    assert len(got) == len(records) - 1, (
+        'В файле jsonl должно быть по одной строке на каждую строку '
+        'результата, кроме заголовка'
+    )
+
+
+@pytest.mark.parametrize('output_format', ['feather', 'parquet'])
+def test_control_output_arrow_types(monkeypatch, tmp_path, output_format):
+    pa = pytest.importorskip('pyarrow')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(outputs, 'batched', lambda rows: ([r] for r in rows))
+    outputs.control_output(
+        [('Статус', 'Количество'), ('Active', 3), ('Total', 3)],
+        cli_args('pep', output_format)
+    )
+    outputs.control_output(
+        [('Ссылка', 'Заголовок', 'Автор'), ('a', 'b', None), ('c', 'd', 'e')],
+        cli_args('whats-new', output_format)
+    )
+    if output_format == 'feather':
+        import pyarrow.feather as reader
+    else:
+        import pyarrow.parquet as reader
+    tables = {
+        path.name.split('_')[0]: reader.read_table(path)
+        for path in tmp_path.glob(f'results/*.{output_format}')
+    }
+    assert tables['pep'].schema.types == [pa.string(), pa.int64()], (
+        'Колонки режима pep должны записываться как строка и целое число'
+    )
+    assert tables['whats-new'].column('Автор').to_pylist() == [None, 'e'], (
+        'Колонка без значений в первой пачке должна быть строковой'
+    )
+
+
 def test_output_file():
     assert hasattr(outputs, 'control_output'), (
         'Напишите функцию `control_output` в модуле `output.py`'
@@ -0,0 +1,66 @@
+import requests_cache
+import requests_mock
+try:
+    from src import page_store
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `page_store.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `page_store.py`'
+
+PAGE = b'<html><body><dl><dt>Status</dt><dd>Active</dd></dl></body></html>'
+URLS = ('https://peps.python.org/pep-0008/', 'https://peps.python.org/pep-8/')
+
+
+def test_page_store_deduplicates_bodies(tmp_path):
+    adapter = requests_mock.Adapter()
+    for url in URLS:
+        adapter.register_uri('GET', url, content=PAGE)
+    cache = page_store.PageStoreCache(tmp_path / 'http_cache')
+    session = requests_cache.CachedSession(backend=cache)
+    session.mount('https://', adapter)
+    for url in URLS:
+        session.get(url)
+    response = session.get(URLS[0])
+    assert response.from_cache and response.content == PAGE, (
+        'Ответ из кеша pagestore должен совпадать с загруженной страницей'
+    )
+    stats = cache.responses.stats()
+    assert (stats['pages'], stats['bodies']) == (2, 1), (
+        'Одинаковые тела страниц должны храниться в pagestore один раз'
+    )
+    removed, _ = cache.responses.evict(0)
+    assert removed == 2 and not len(cache.responses), (
+        '`PageStore.evict` должен удалять ответы, пока размер кеша '
+        'больше заданного'
+    )
+    session.close()
+
+
+def test_page_store_evicts_least_recently_read(monkeypatch, tmp_path):
+    monkeypatch.setattr(page_store, 'PAGE_STORE_ACCESS_BATCH', 1)
+    adapter = requests_mock.Adapter()
+    for url in URLS:
+        adapter.register_uri('GET', url, content=PAGE + url.encode())
+    cache = page_store.PageStoreCache(tmp_path / 'http_cache')
+    session = requests_cache.CachedSession(backend=cache)
+    session.mount('https://', adapter)
+    for url in URLS:
+        session.get(url)
+    session.close()
+    reader = requests_cache.CachedSession(
+        backend=page_store.PageStoreCache(tmp_path / 'http_cache')
+    )
+    reader.mount('https://', adapter)
+    assert reader.get(URLS[0]).from_cache
+    prune = page_store.PageStore(page_store.page_store_path(
+        tmp_path / 'http_cache'
+    ))
+    removed, _ = prune.evict(prune.size - 1)
+    assert removed == 1 and URLS[0] in {
+        response.url for response in map(prune.__getitem__, prune)
+    }, (
+        'Недавно прочитанная страница должна удаляться из кеша последней, '
+        'даже если сессия, которая её читала, не закрыта'
+    )
+    prune.close()
+    reader.close()
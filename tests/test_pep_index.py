@@ -0,0 +1,31 @@
+try:
+    from src import pep_index
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep_index.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep_index.py`'
+
+RECORDS = [
+    (
+        1, 'PA', 'https://peps.python.org/pep-0001/', 'Active', 'Process',
+        'Barry Warsaw', '13-Jun-2000'
+    ),
+    (
+        505, 'SD', 'https://peps.python.org/pep-0505/', 'Deferred',
+        'Standards Track', 'Mark E. Haase', '18-Sep-2015'
+    ),
+]
+
+
+def test_pep_index_query(tmp_path):
+    index = pep_index.PepIndex(tmp_path / 'state' / 'pep_index.sqlite3')
+    index.update(RECORDS)
+    got = list(index.query(status='Deferred', pep_type='Standards Track'))
+    index.close()
+    assert got == [(
+        505, 'SD', 'Deferred', 'Standards Track', 'Mark E. Haase',
+        '2015-09-18', 'https://peps.python.org/pep-0505/'
+    )], (
+        'Метод `PepIndex.query` должен вернуть только PEP, подходящие '
+        'под фильтры, с датой создания в формате ISO'
+    )
@@ -0,0 +1,39 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+try:
+    from src import service
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `service.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `service.py`'
+
+
+def test_result_server_returns_latest_results():
+    store = service.ResultStore(['pep', 'whats-new'])
+    store.update('pep', [('Статус', 'Количество'), ('Active', 1)])
+    server = service.ResultServer(('127.0.0.1', 0), store)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/'
+    try:
+        with urlopen(url + 'pep') as response:
+            got = json.load(response)
+        assert got['columns'] == ['Статус', 'Количество'], (
+            'API должен отдавать заголовок результата режима в `columns`'
+        )
+        assert got['rows'] == [['Active', 1]], (
+            'API должен отдавать строки результата режима в `rows`'
+        )
+        try:
+            urlopen(url + 'whats-new')
+        except HTTPError as e:
+            assert e.code == 503, (
+                'Пока результаты режима не получены, API должен '
+                'отвечать кодом 503'
+            )
+        else:
+            assert False, 'Для режима без результатов ожидается ошибка 503'
+    finally:
+        server.shutdown()
+        server.server_close()
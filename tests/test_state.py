@@ -0,0 +1,26 @@
+try:
+    from src import state
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `state.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `state.py`'
+
+URL = 'https://peps.python.org/pep-0008/'
+
+
+def test_page_state_skips_unchanged_pages(tmp_path):
+    path = tmp_path / 'state' / 'pep.json'
+    page_state = state.PageState(path)
+    page_state.set(URL, b'<dl></dl>', 'Active')
+    page_state.save()
+
+    page_state = state.PageState(path)
+    got = page_state.get(URL, b'<dl></dl>')
+    assert got == 'Active', (
+        'Для неизменившейся страницы `PageState.get` должен вернуть '
+        'сохранённое значение'
+    )
+    got = page_state.get(URL, b'<dl>new</dl>')
+    assert got is None, (
+        'Для изменившейся страницы `PageState.get` должен вернуть `None`'
+    )
@@ -0,0 +1,61 @@
+import requests
+try:
+    from src import throttling
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+
+
+def test_retry_delay_honors_retry_after():
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '7'
+    assert throttling.retry_delay(response, 0) == 7, (
+        'Пауза перед повтором должна браться из заголовка `Retry-After`'
+    )
+    assert throttling.retry_delay(None, 2) > throttling.retry_delay(None, 1), (
+        'Без заголовка `Retry-After` пауза должна расти экспоненциально'
+    )
+
+
+def test_adaptive_limiter_decreases_on_overload():
+    limiter = throttling.AdaptiveLimiter(8)
+    limiter.acquire()
+    limiter.release(latency=0.1, overloaded=True)
+    assert limiter.limit == 4, (
+        'После ответа 429/5xx предел одновременных запросов должен '
+        'уменьшаться вдвое'
+    )
+
+
+def test_throttled_adapter_retries_overloaded_host(monkeypatch):
+    statuses = iter([429, 429, 200])
+    sent = []
+    sleeps = []
+
+    def send(adapter, request, **kwargs):
+        sent.append(request.url)
+        response = requests.Response()
+        response.status_code = next(statuses)
+        response.headers['Retry-After'] = '1'
+        response._content = b''
+        response._content_consumed = True
+        return response
+
+    monkeypatch.setattr(throttling.HTTPAdapter, 'send', send)
+    monkeypatch.setattr(throttling.time, 'sleep', sleeps.append)
+    adapter = throttling.ThrottledAdapter(max_concurrency=4)
+    request = requests.Request('GET', 'https://peps.python.org/').prepare()
+    response = adapter.send(request)
+    assert response.status_code == 200, (
+        '`ThrottledAdapter` должен повторять запрос после ответов 429'
+    )
+    assert len(sent) == 3 and sleeps == [1, 1], (
+        'Перед каждым повтором нужна пауза из заголовка `Retry-After`'
+    )
+    _, limiter = adapter.host_limits(request.url)
+    assert limiter.limit == 2, (
+        'Предел одновременных запросов должен уменьшаться вдвое после '
+        'каждого ответа 429 и расти после быстрого успешного ответа'
+    )
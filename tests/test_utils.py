@@ -1,3 +1,5 @@
+import time
+
 import pytest
 import requests
 import requests_mock
@@ -38,6 +40,25 @@ def test_find_tag_exception(soup):
     )
 
 
+def test_find_tag_exception_excerpt():
+    html = ''.join(f'<p>Абзац {i}</p>' for i in range(1000))
+    soup = bs4.BeautifulSoup(html, features='lxml')
+    with pytest.raises(BaseException) as excinfo:
+        utils.find_tag(soup, 'unexpected')
+    assert excinfo.typename == 'ParserFindTagException', (
+        'Функция `find_tag` в модуле `utils.py` в случае '
+        'отсутствия искомого тэга '
+        'должна выбросить нестандартное исключение `ParserFindTagException`'
+    )
+    assert 'Абзац 0' in str(excinfo.value), (
+        'Сообщение об отсутствии тега должно содержать начало страницы'
+    )
+    assert len(str(excinfo.value)) < 500, (
+        'Сообщение об отсутствии тега должно содержать '
+        'только короткий фрагмент страницы'
+    )
+
+
 def test_get_response(mock_session):
     with requests_mock.Mocker() as mock:
         mock.get(
@@ -54,3 +75,179 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_map_urls_order_and_errors():
+    urls = [f'{MAIN_DOC_URL}page-{i}/' for i in range(12)]
+    session = requests.Session()
+    with requests_mock.Mocker(session=session) as mock:
+        for i, url in enumerate(urls):
+            mock.get(url, text=lambda request, context, i=i: (
+                time.sleep((12 - i) / 1000) or f'page {i}'
+            ))
+        mock.get(urls[5], exc=requests.exceptions.ConnectTimeout)
+        got = list(utils.map_urls(
+            lambda url: session.get(url).text, urls, workers=4
+        ))
+    assert [url for url, _ in got] == urls, (
+        'Функция `map_urls` должна возвращать результаты в порядке urls '
+        'при загрузке в несколько потоков'
+    )
+    assert isinstance(got[5][1], requests.RequestException), (
+        'Функция `map_urls` должна возвращать исключение '
+        'незагрузившейся страницы вместо результата'
+    )
+    assert [page for _, page in got[:5]] == [f'page {i}' for i in range(5)]
+
+
+ARCHIVE_URL = MAIN_DOC_URL + 'archives/python-docs-pdf-a4.zip'
+ARCHIVE = b'0123456789' * 10
+
+
+@pytest.fixture
+def archive_session(tempfile_session):
+    adapter = requests_mock.Adapter()
+    tempfile_session.mount('https://', adapter)
+    return tempfile_session, adapter
+
+
+def etag_path(file_path):
+    return file_path.with_name(file_path.name + '.etag')
+
+
+def test_download_file_fresh(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri(
+        'GET', ARCHIVE_URL, content=ARCHIVE, headers={'ETag': '"v1"'}
+    )
+    file_path = tmp_path / 'archive.zip'
+    assert utils.download_file(session, ARCHIVE_URL, file_path) is True
+    assert file_path.read_bytes() == ARCHIVE, (
+        'Функция `download_file` должна сохранить файл целиком'
+    )
+    assert etag_path(file_path).read_text() == '"v1"', (
+        'Функция `download_file` должна сохранить ETag файла'
+    )
+    assert 'Range' not in adapter.last_request.headers
+
+
+def test_download_file_resume(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri(
+        'GET', ARCHIVE_URL, status_code=206, content=ARCHIVE[40:],
+        headers={'ETag': '"v1"', 'Content-Range': 'bytes 40-99/100'}
+    )
+    file_path = tmp_path / 'archive.zip'
+    file_path.write_bytes(ARCHIVE[:40])
+    etag_path(file_path).write_text('"v1"')
+    assert utils.download_file(session, ARCHIVE_URL, file_path) is True
+    headers = adapter.last_request.headers
+    assert headers['Range'] == 'bytes=40-', (
+        'Функция `download_file` должна запросить остаток файла'
+    )
+    assert headers['If-Range'] == '"v1"'
+    assert file_path.read_bytes() == ARCHIVE, (
+        'Функция `download_file` должна дописать остаток к файлу'
+    )
+
+
+def test_download_file_complete(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri(
+        'GET', ARCHIVE_URL, status_code=416,
+        headers={'Content-Range': 'bytes */100'}
+    )
+    file_path = tmp_path / 'archive.zip'
+    file_path.write_bytes(ARCHIVE)
+    etag_path(file_path).write_text('"v1"')
+    assert utils.download_file(session, ARCHIVE_URL, file_path) is False, (
+        'Если файл загружен целиком, `download_file` должна вернуть False'
+    )
+    assert file_path.read_bytes() == ARCHIVE
+
+
+def test_download_file_size_mismatch(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri('GET', ARCHIVE_URL, [
+        {'status_code': 416, 'headers': {'Content-Range': 'bytes */100'}},
+        {'content': ARCHIVE, 'headers': {'ETag': '"v2"'}},
+    ])
+    file_path = tmp_path / 'archive.zip'
+    file_path.write_bytes(ARCHIVE + b'tail')
+    etag_path(file_path).write_text('"v1"')
+    assert utils.download_file(session, ARCHIVE_URL, file_path) is True
+    assert adapter.call_count == 2
+    assert 'Range' not in adapter.last_request.headers, (
+        'Файл другого размера должен загружаться заново целиком'
+    )
+    assert file_path.read_bytes() == ARCHIVE
+    assert etag_path(file_path).read_text() == '"v2"'
+
+
+def test_download_file_changed_etag(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri(
+        'GET', ARCHIVE_URL, content=ARCHIVE, headers={'ETag': '"v2"'}
+    )
+    file_path = tmp_path / 'archive.zip'
+    file_path.write_bytes(b'old part')
+    etag_path(file_path).write_text('"v1"')
+    assert utils.download_file(session, ARCHIVE_URL, file_path) is True
+    assert file_path.read_bytes() == ARCHIVE, (
+        'Если ETag изменился, файл должен быть перезаписан, а не дописан'
+    )
+    assert etag_path(file_path).read_text() == '"v2"'
+
+
+def test_download_file_clears_stale_etag(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri('GET', ARCHIVE_URL, content=ARCHIVE)
+    file_path = tmp_path / 'archive.zip'
+    file_path.write_bytes(b'old part')
+    etag_path(file_path).write_text('"v1"')
+    assert utils.download_file(session, ARCHIVE_URL, file_path) is True
+    assert file_path.read_bytes() == ARCHIVE
+    assert not etag_path(file_path).exists(), (
+        'Если сервер не вернул ETag, старый файл .etag должен быть удалён'
+    )
+
+
+def test_download_file_error_status(archive_session, tmp_path):
+    session, adapter = archive_session
+    adapter.register_uri(
+        'GET', ARCHIVE_URL, status_code=404, text='<html>Not Found</html>',
+        headers={'ETag': '"err"'}
+    )
+    file_path = tmp_path / 'archive.zip'
+    file_path.write_bytes(ARCHIVE[:40])
+    with pytest.raises(BaseException) as excinfo:
+        utils.download_file(session, ARCHIVE_URL, file_path)
+    assert excinfo.typename == 'ResponseIsNoneException', (
+        'При ответе с ошибкой `download_file` должна выбросить '
+        'исключение `ResponseIsNoneException`'
+    )
+    assert file_path.read_bytes() == ARCHIVE[:40], (
+        'Ответ с ошибкой не должен записываться в файл архива'
+    )
+    assert not etag_path(file_path).exists(), (
+        'ETag ответа с ошибкой не должен сохраняться'
+    )
+
+
+def test_download_file_keeps_session_cache(archive_session, tmp_path):
+    session, adapter = archive_session
+    cache_disabled = []
+
+    def archive(request, context):
+        cache_disabled.append(session.settings.disabled)
+        return ARCHIVE
+
+    adapter.register_uri('GET', ARCHIVE_URL, content=archive)
+    utils.download_file(session, ARCHIVE_URL, tmp_path / 'archive.zip')
+    assert cache_disabled == [False], (
+        'Функция `download_file` не должна выключать кеш общей сессии: '
+        'её используют режимы в других потоках'
+    )
+    assert not session.cache.contains(url=ARCHIVE_URL), (
+        'Архив не должен сохраняться в кеш HTTP-ответов'
+    )
@@ -0,0 +1,40 @@
+try:
+    from src import work_queue
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `work_queue.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `work_queue.py`'
+
+
+def test_work_queue_shards(tmp_path):
+    queue = work_queue.WorkQueue(tmp_path / 'queue.sqlite3')
+    assert queue.enqueue('pep', list(range(5)), 2) == 3, (
+        '`WorkQueue.enqueue` должен делить элементы на шарды по shard_size'
+    )
+    claimed = [queue.claim(['pep']) for _ in range(3)]
+    assert [items for _, _, items in claimed] == [[0, 1], [2, 3], [4]], (
+        '`WorkQueue.claim` должен выдавать шарды по порядку'
+    )
+    assert queue.claim(['pep']) is None, (
+        'Взятый шард не должен выдаваться повторно до истечения срока'
+    )
+    for shard_id, _, items in reversed(claimed):
+        queue.complete(shard_id, [(item, 'Final') for item in items])
+    assert queue.pending('pep') == 0
+    assert [item for item, _ in queue.rows('pep')] == list(range(5)), (
+        '`WorkQueue.rows` должен отдавать строки в порядке шардов'
+    )
+    queue.close()
+
+
+def test_work_queue_expired_lease(tmp_path):
+    path = tmp_path / 'queue.sqlite3'
+    queue = work_queue.WorkQueue(path, lease=0)
+    queue.enqueue('pep', ['a'], 10)
+    first = queue.claim()
+    other = work_queue.WorkQueue(path, lease=0)
+    assert other.claim() == first, (
+        'Шард, не завершённый за срок lease, должен выдаваться снова'
+    )
+    queue.close()
+    other.close()